@@ -0,0 +1,68 @@
+import argparse
+import time
+from benchmarks.synthetic import (
+    START_DATE,
+    make_budget,
+    make_expenses,
+    make_parameters,
+)
+from expenses_app.cache import portfolio_spends
+from expenses_app.decompose import (
+    STRATEGIES,
+    solution_quality,
+    solve_decomposed,
+)
+from expenses_app.store import ExpenseStore
+from expenses_app.worker import solve_portfolio
+
+
+def run(n_expenses: int, n_periods: int, parts: list[int]):
+    expenses = ExpenseStore(make_expenses(n_expenses, n_periods))
+    budget = make_budget(make_expenses(n_expenses, n_periods), n_periods)
+    parameters = make_parameters()
+    targets = list(expenses.column('target'))
+
+    start = time.perf_counter()
+    solved = solve_portfolio(
+        expenses.to_portfolio(budget), parameters, START_DATE
+    )
+    monolithic_time = time.perf_counter() - start
+    reference = solution_quality(portfolio_spends(solved), targets)
+
+    print(f'{n_expenses} gastos x {n_periods} períodos')
+    print(
+        f'  inteiro:            {monolithic_time:8.3f}s  '
+        f'total R$ {reference.total_spend}  desvio R$ {reference.deviation}'
+    )
+
+    for strategy in STRATEGIES:
+        for n_parts in parts:
+            start = time.perf_counter()
+            try:
+                spends = solve_decomposed(
+                    expenses, budget, parameters, START_DATE, n_parts, strategy
+                )
+            except Exception as err:
+                print(f'  {strategy:>9} x{n_parts:<3}  sem solução ({err})')
+                continue
+            elapsed = time.perf_counter() - start
+            gap = solution_quality(spends, targets).gap(reference)
+            print(
+                f'  {strategy:>9} x{n_parts:<3}  {elapsed:8.3f}s  '
+                f'({monolithic_time / elapsed:.2f}x)  '
+                f"total {gap['total_spend']:+.2%}  "
+                f"desvio {gap['deviation']:+.2%}"
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compara a otimização em partes com a do portfólio '
+        'inteiro.'
+    )
+    parser.add_argument('--expenses', type=int, default=500)
+    parser.add_argument('--periods', type=int, default=12)
+    parser.add_argument('--parts', type=int, nargs='+', default=[2, 4, 8])
+    args = parser.parse_args()
+
+    run(args.expenses, args.periods, args.parts)
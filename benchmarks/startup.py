@@ -0,0 +1,106 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+
+
+HEAVY_MODULES = ('expenses_opt', 'pendulum', 'ortools', 'numpy')
+
+
+class RecordingPage:
+    # Stands in for ft.Page: counts the messages the first frame would send.
+    def __init__(self) -> None:
+        self.title = None
+        self.scroll = None
+        self.overlay = []
+        self.controls = []
+        self.floating_action_button = None
+        self.dialog = None
+        self.session_id = 'benchmark'
+        self.round_trips = 0
+
+    def add(self, *controls):
+        self.controls.extend(controls)
+        self.round_trips += 1
+
+    def update(self, *controls):
+        self.round_trips += 1
+
+
+def first_frame() -> dict:
+    start = time.perf_counter()
+    from expenses_app.main import Aplication
+
+    imported = time.perf_counter()
+    app = Aplication()
+    page = RecordingPage()
+    app.main(page=page)
+    rendered = time.perf_counter()
+
+    return {
+        'import_ms': round((imported - start) * 1000, 1),
+        'first_frame_ms': round((rendered - start) * 1000, 1),
+        'round_trips': page.round_trips,
+        'heavy_modules_loaded': [
+            name for name in HEAVY_MODULES if name in sys.modules
+        ],
+    }
+
+
+def import_profile(module: str) -> list[tuple[int, str]]:
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|(\s+)(\S+)', line)
+        if match and len(match.group(2)) <= 3:
+            profile.append((int(match.group(1)), match.group(3)))
+    return sorted(profile, reverse=True)
+
+
+def run(repeat: int):
+    samples = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--child'],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(completed.stdout))
+
+    def median(key):
+        values = sorted(sample[key] for sample in samples)
+        return values[len(values) // 2]
+
+    print(f'Partida a frio ({repeat} execuções, mediana)')
+    print(f"  import de expenses_app.main: {median('import_ms')} ms")
+    print(f"  primeiro quadro:             {median('first_frame_ms')} ms")
+    print(f"  mensagens no primeiro quadro: {samples[0]['round_trips']}")
+    print(
+        '  módulos pesados carregados: '
+        f"{', '.join(samples[0]['heavy_modules_loaded']) or 'nenhum'}"
+    )
+    print('Maiores imports de primeiro nível (ms):')
+    for micros, name in import_profile('expenses_app.main')[:10]:
+        print(f'  {micros / 1000:8.1f}  {name}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Mede o tempo de partida da interface.'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(first_frame()))
+    else:
+        run(args.repeat)
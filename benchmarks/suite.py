@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from benchmarks.startup import RecordingPage
+from benchmarks.synthetic import (
+    START_DATE,
+    make_budget,
+    make_expenses,
+    make_parameters,
+    make_portfolio,
+)
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_SIZES = ('100x6', '1000x12', '10000x12')
+TOLERANCE = 0.2
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    n_expenses, n_periods = size.lower().split('x')
+    return int(n_expenses), int(n_periods)
+
+
+def build_app(n_expenses: int, n_periods: int):
+    from expenses_app.main import Aplication
+
+    app = Aplication()
+    app.main(page=RecordingPage())
+
+    budget = make_budget(make_expenses(n_expenses, n_periods), n_periods)
+    app.input_budget_initial.value = str(budget.initial).replace('.', ',')
+    app.input_budget_recorrent.value = str(budget.recorrent).replace('.', ',')
+    app.input_budget_last_recorrence.value = START_DATE.add(
+        days=budget.last_recurrence
+    ).format('DD/MM/YYYY')
+    app.input_budget_number_of_iterations.value = str(n_periods)
+    app.input_opt_start_date.value = START_DATE.format('DD/MM/YYYY')
+    return app
+
+
+def prepare(n_expenses: int, n_periods: int, directory: str) -> dict:
+    from expenses_app.exporter import export_expenses
+    from expenses_app.worker import solve_portfolio
+
+    csv_path = os.path.join(directory, f'gastos_{n_expenses}.csv')
+    export_expenses(csv_path, make_expenses(n_expenses, n_periods))
+    solved = solve_portfolio(
+        make_portfolio(n_expenses, n_periods), make_parameters(), START_DATE
+    )
+    app = build_app(n_expenses, n_periods)
+    app.expenses_data.extend(make_expenses(n_expenses, n_periods))
+
+    return {'csv_path': csv_path, 'solved': solved, 'app': app}
+
+
+def step_csv_import(n_expenses, n_periods, data):
+    from expenses_app.batch import load_expenses
+
+    load_expenses(data['csv_path'])
+
+
+def step_get_portfolio(n_expenses, n_periods, data):
+    app = data['app']
+    app.get_portfolio(app.read_forms(app.parameters_form, app.budget_form))
+
+
+def step_solve(n_expenses, n_periods, data):
+    from expenses_app.worker import solve_portfolio
+
+    solve_portfolio(
+        make_portfolio(n_expenses, n_periods), make_parameters(), START_DATE
+    )
+
+
+def step_results_table(n_expenses, n_periods, data):
+    data['app'].show_optimization_results(portfolio=data['solved'])
+
+
+def step_import_table(n_expenses, n_periods, data):
+    app = build_app(n_expenses, n_periods)
+    event = SimpleNamespace(
+        files=[
+            SimpleNamespace(
+                path=data['csv_path'],
+                name=os.path.basename(data['csv_path']),
+            )
+        ]
+    )
+    app.handle_import(event).result()
+
+
+STEPS = {
+    'csv_import': step_csv_import,
+    'get_portfolio': step_get_portfolio,
+    'solve': step_solve,
+    'results_table': step_results_table,
+    'import_table': step_import_table,
+}
+
+
+def measure(step, n_expenses, n_periods, data, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        step(n_expenses, n_periods, data)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    step(n_expenses, n_periods, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        'seconds': round(seconds, 6),
+        'throughput': round(n_expenses / seconds, 1) if seconds else None,
+        'peak_mib': round(peak / 2**20, 3),
+    }
+
+
+def run(sizes: list[str], steps: list[str], repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            n_expenses, n_periods = parse_size(size)
+            data = prepare(n_expenses, n_periods, directory)
+            for name in steps:
+                key = f'{name}[{size}]'
+                results[key] = measure(
+                    STEPS[name], n_expenses, n_periods, data, repeat
+                )
+                print(
+                    f"{key:32} {results[key]['seconds'] * 1000:10.1f} ms"
+                    f"{results[key]['throughput'] or 0:14.0f} gastos/s"
+                    f"{results[key]['peak_mib']:10.1f} MiB"
+                )
+    return results
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float
+) -> tuple[list[str], list[str]]:
+    # Returns the regressions and the measurements the baseline lacks.
+    regressions = []
+    missing = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            missing.append(key)
+            continue
+        for metric in ('seconds', 'peak_mib'):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f'{key} {metric}: {previous[metric]} -> {current[metric]}'
+                )
+    return regressions, missing
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Benchmarks de importação, otimização e renderização.'
+    )
+    parser.add_argument(
+        '--sizes',
+        nargs='+',
+        default=list(DEFAULT_SIZES),
+        help='Tamanhos no formato <gastos>x<períodos>',
+    )
+    parser.add_argument(
+        '--steps', nargs='+', default=list(STEPS), choices=list(STEPS)
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Grava os resultados como nova linha de base',
+    )
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.steps, args.repeat)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f'Linha de base gravada em {args.baseline}')
+        return 0
+
+    # No baseline is committed: timings depend on the machine, so each one
+    # records its own with --save-baseline.
+    if not os.path.exists(args.baseline):
+        print(
+            f'Nenhuma linha de base em {args.baseline}: regressões não foram '
+            'verificadas. Grave uma nesta máquina com --save-baseline.'
+        )
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        regressions, missing = compare(
+            results, json.load(file), args.tolerance
+        )
+
+    for key in missing:
+        print(f'Sem linha de base para {key}: não comparado')
+    for regression in regressions:
+        print(f'REGRESSÃO {regression}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import random
+import pendulum
+from expenses_opt.models.expense import Expense, ExpenseRange
+from expenses_opt.models.portfolio import Budget, Portfolio
+from expenses_opt.optimization.optimizer import OptmizationParameters
+from expenses_opt.constants import Priority
+
+
+START_DATE = pendulum.datetime(2024, 1, 1)
+RECURRENCE = 30
+
+
+def make_expenses(
+    n_expenses: int, n_periods: int, seed: int = 0
+) -> list[Expense]:
+    rng = random.Random(seed)
+    priorities = list(Priority)
+    horizon = max(n_periods * RECURRENCE, 1)
+
+    expenses = []
+    for index in range(n_expenses):
+        minimum = round(rng.uniform(10, 500), 2)
+        maximum = round(minimum * rng.uniform(1.1, 3), 2)
+        target = round(rng.uniform(minimum, maximum), 2)
+        expenses.append(
+            Expense(
+                description=f'Gasto {index + 1}',
+                due_date=START_DATE.add(days=rng.randrange(1, horizon + 1)),
+                priority=rng.choice(priorities),
+                mandatory=rng.random() < 0.2,
+                range=ExpenseRange(
+                    minimum=minimum, maximum=maximum, target=target
+                ),
+            )
+        )
+
+    return expenses
+
+
+def make_budget(expenses: list[Expense], n_periods: int) -> Budget:
+    # Enough money for the targets, spread over the horizon.
+    total_target = sum(expense.range.target for expense in expenses)
+    recorrent = round(total_target / max(n_periods, 1), 2)
+
+    return Budget(
+        initial=recorrent,
+        recorrent=recorrent,
+        recurrence=RECURRENCE,
+        last_recurrence=(n_periods - 1) * RECURRENCE,
+        iterations=n_periods,
+    )
+
+
+def make_portfolio(
+    n_expenses: int, n_periods: int, seed: int = 0
+) -> Portfolio:
+    expenses = make_expenses(n_expenses, n_periods, seed)
+    return Portfolio(
+        expenses=expenses, budget=make_budget(expenses, n_periods)
+    )
+
+
+def make_parameters(max_time: int = 60) -> OptmizationParameters:
+    return OptmizationParameters(
+        priority_exponent=2, deviation_weight=0, max_time=max_time
+    )
@@ -0,0 +1,33 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+# The app runs Flet in sync mode, where every event handler gets a thread of
+# its own and async handlers would need the whole page to switch to async
+# mode. File work is scheduled instead on one event loop that lives on a
+# background thread: a handler submits a coroutine and returns at once, and
+# the coroutine hands blocking reads and writes to asyncio.to_thread.
+class BackgroundLoop:
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name='expenses-app-io',
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def submit(self, coroutine: Coroutine[Any, Any, Any]) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+
+io_loop = BackgroundLoop()
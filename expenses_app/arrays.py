@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+from expenses_app.store import ExpenseStore, target_column
+
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.portfolio import Budget
+
+
+def budget_income(budget: 'Budget') -> np.ndarray:
+    # Money received in each period: the initial budget in the first one and
+    # the recurrent amount in every period whose start is on or before the
+    # last recurrence.
+    starts = np.arange(budget.iterations) * budget.recurrence
+    income = np.where(
+        (starts > 0) & (starts <= budget.last_recurrence),
+        float(budget.recorrent),
+        0.0,
+    )
+    if budget.iterations:
+        income[0] += budget.initial
+    return income
+
+
+def utilization(period_totals: np.ndarray, budget: 'Budget') -> np.ndarray:
+    # Share of the money received so far that has been spent, per period.
+    available = np.cumsum(budget_income(budget))
+    spent = np.cumsum(period_totals)
+    return np.divide(
+        spent, available, out=np.zeros_like(spent), where=available > 0
+    )
+
+
+# Array view over the expenses of a portfolio. The price, priority,
+# mandatory and due date columns are read straight from the buffers of an
+# ExpenseStore snapshot, so building the view copies nothing.
+@dataclass
+class PortfolioArrays:
+    minimum: np.ndarray
+    maximum: np.ndarray
+    target: np.ndarray
+    priority: np.ndarray
+    mandatory: np.ndarray
+    due_offset: np.ndarray
+
+    @classmethod
+    def from_store(
+        cls,
+        store: ExpenseStore,
+        start_date: 'pendulum.DateTime',
+        target_choice: str = 'Desejável',
+    ) -> 'PortfolioArrays':
+        # The snapshot keeps the exported buffers out of the store's way:
+        # its next write copies the columns instead of resizing them.
+        store = store.snapshot()
+
+        def column(name: str) -> np.ndarray:
+            values = store.column(name)
+            # array typecodes are C types, which numpy understands as is.
+            if not len(values):
+                return np.empty(0, dtype=values.typecode)
+            return np.frombuffer(values, dtype=values.typecode)
+
+        return cls(
+            minimum=column('minimum'),
+            maximum=column('maximum'),
+            target=column(target_column(target_choice)),
+            priority=column('priority'),
+            mandatory=column('mandatory').astype(bool),
+            due_offset=column('due_date') - start_date.toordinal(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.minimum)
+
+    def due_period(self, recurrence: int, iterations: int) -> np.ndarray:
+        # Last period in which each expense can still be paid.
+        return np.clip(self.due_offset // recurrence, 0, iterations - 1)
+
+    def mandatory_minimums(self, budget: 'Budget') -> np.ndarray:
+        # Least that must have been paid by the end of each period.
+        periods = self.due_period(budget.recurrence, budget.iterations)
+        return np.bincount(
+            periods[self.mandatory],
+            weights=self.minimum[self.mandatory],
+            minlength=budget.iterations,
+        )
+
+    def order(self, key: str = 'due_date', descending: bool = False):
+        values = {
+            'due_date': self.due_offset,
+            'priority': self.priority,
+            'minimum': self.minimum,
+            'maximum': self.maximum,
+            'target': self.target,
+        }[key]
+        indices = np.argsort(values, kind='stable')
+        return indices[::-1] if descending else indices
+
+
+def spends_matrix(
+    spends: Optional[list[list[float]]],
+) -> Optional[np.ndarray]:
+    if spends is None:
+        return None
+    if not spends:
+        return np.zeros((0, 0))
+    return np.asarray(spends, dtype=np.float64).T
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from expenses_app.exporter import result_columns, write_columns
+from expenses_app.feasibility import check_feasibility
+from expenses_app.importer import ImportReport, iter_expense_chunks
+from expenses_app.parsing import parse_date
+from expenses_app.pipeline import build_budget, build_parameters, optimize
+from expenses_app.store import ExpenseStore
+from expenses_app.worker import MP_CONTEXT
+
+
+# Headless runner: python -m expenses_app.batch <csv or dir> --config cfg.json
+#
+# The config mirrors the form fields of the GUI:
+# {
+#   "start_date": "01/01/2024",
+#   "budget": {"initial": 1000, "recorrent": 500, "recurrence": "Mensal",
+#              "last_recurrence": "01/06/2024", "iterations": 6},
+#   "parameters": {"priority_exponent": 2, "deviation_weight": 0,
+#                  "max_time": 60, "target_choice": "Desejável",
+#                  "parts": 1, "strategy": "due_date",
+#                  "window": null, "overlap": 0}
+# }
+# A <name>.json next to <name>.csv overrides the shared config.
+
+
+def load_config(path: str) -> dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def config_for(csv_path: str, default: Optional[dict]) -> dict:
+    own_config = os.path.splitext(csv_path)[0] + '.json'
+    if os.path.exists(own_config):
+        return load_config(own_config)
+    if default is None:
+        raise ValueError(f'Nenhuma configuração para {csv_path}')
+    return default
+
+
+def load_expenses(csv_path: str) -> tuple[ExpenseStore, ImportReport]:
+    store = ExpenseStore()
+    report = ImportReport()
+    for chunk in iter_expense_chunks(csv_path):
+        store.extend(chunk.expenses)
+        report.add(chunk)
+    return store, report
+
+
+def horizon_options(params_config: dict) -> tuple[int, Optional[int], int]:
+    # Same rules as the form: a window of None solves every period at once.
+    parts = int(params_config.get('parts', 1))
+    window = params_config.get('window')
+    window = int(window) if window is not None else None
+    overlap = int(params_config.get('overlap', 0)) if window is not None else 0
+    if window is not None and overlap >= window:
+        raise ValueError('A sobreposição deve ser menor que a janela')
+    if window is not None and parts > 1:
+        raise ValueError(
+            'Escolha entre dividir em partes e otimizar por janelas'
+        )
+    return parts, window, overlap
+
+
+def run_file(csv_path: str, config: dict, output_dir: str) -> dict:
+    from expenses_opt.exceptions import (
+        InfeasibleProblemException,
+        InvalidDataException,
+    )
+
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    summary = {'file': csv_path, 'status': 'ok'}
+
+    try:
+        expenses, report = load_expenses(csv_path)
+        summary['imported'] = report.imported
+        summary['skipped'] = [
+            {'line': line, 'reason': reason} for line, reason in report.skipped
+        ]
+
+        start_date = parse_date(config['start_date'])
+        budget_config = config['budget']
+        budget = build_budget(
+            initial=float(budget_config['initial']),
+            recorrent=float(budget_config['recorrent']),
+            recurrence=budget_config.get('recurrence', 'Mensal'),
+            last_recurrence_date=parse_date(budget_config['last_recurrence']),
+            iterations=int(budget_config['iterations']),
+            start_date=start_date,
+        )
+        params_config = config.get('parameters', {})
+        parameters = build_parameters(
+            priority_exponent=float(params_config.get('priority_exponent', 2)),
+            deviation_weight=float(params_config.get('deviation_weight', 0)),
+            max_time=int(params_config.get('max_time', 10000)),
+        )
+
+        target_choice = params_config.get('target_choice', 'Desejável')
+        parts, window, overlap = horizon_options(params_config)
+        feasibility = check_feasibility(
+            expenses, budget, start_date, target_choice
+        )
+        if not feasibility.feasible:
+            summary['status'] = 'infeasible'
+            summary['conflicts'] = feasibility.messages()
+            return summary
+
+        portfolio = optimize(
+            expenses=expenses,
+            budget=budget,
+            parameters=parameters,
+            start_date=start_date,
+            target_choice=target_choice,
+            parts=parts,
+            strategy=params_config.get('strategy', 'due_date'),
+            window=window,
+            overlap=overlap,
+        )
+
+        columns = result_columns(portfolio)
+        results = os.path.join(output_dir, f'{name}_resultados.csv')
+        write_columns(results, columns)
+    except InfeasibleProblemException:
+        summary['status'] = 'infeasible'
+        return summary
+    except InvalidDataException:
+        summary['status'] = 'invalid'
+        return summary
+    except Exception as err:
+        # Anything else (an unreadable csv, a solver failure) stays in this
+        # file's entry, so the other files still run and resumo.json is
+        # still written.
+        summary['status'] = 'error'
+        summary['error'] = f'{type(err).__name__}: {err}'
+        return summary
+
+    summary['total_spend'] = round(sum(columns['total']), 2)
+    summary['results'] = results
+    return summary
+
+
+def collect_inputs(path: str) -> list[str]:
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, entry)
+            for entry in os.listdir(path)
+            if entry.lower().endswith('.csv')
+        )
+    return [path]
+
+
+def run_batch(
+    paths: list[str],
+    config: Optional[dict],
+    output_dir: str,
+    workers: int = 1,
+) -> list[dict]:
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    summaries = []
+    for path in paths:
+        try:
+            jobs.append((path, config_for(path, config), output_dir))
+        except (OSError, ValueError) as err:
+            summaries.append(
+                {'file': path, 'status': 'error', 'error': str(err)}
+            )
+
+    if workers <= 1 or len(jobs) <= 1:
+        summaries.extend(run_file(*job) for job in jobs)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=MP_CONTEXT
+        ) as executor:
+            summaries.extend(executor.map(run_file, *zip(*jobs)))
+
+    return summaries
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m expenses_app.batch',
+        description='Otimiza portfólios de gastos sem interface gráfica.',
+    )
+    parser.add_argument(
+        'input', help='Arquivo csv ou diretório com arquivos csv'
+    )
+    parser.add_argument(
+        '-c', '--config', help='JSON com orçamento e parâmetros'
+    )
+    parser.add_argument(
+        '-o', '--output', default='resultados', help='Diretório de saída'
+    )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Número de portfólios otimizados em paralelo',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    config = load_config(args.config) if args.config else None
+
+    summaries = run_batch(
+        paths=collect_inputs(args.input),
+        config=config,
+        output_dir=args.output,
+        workers=args.workers,
+    )
+
+    with open(
+        os.path.join(args.output, 'resumo.json'), 'w', encoding='utf-8'
+    ) as file:
+        json.dump(summaries, file, ensure_ascii=False, indent=2)
+
+    for summary in summaries:
+        print(f"{summary['file']}: {summary['status']}")
+
+    return 0 if all(s['status'] == 'ok' for s in summaries) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
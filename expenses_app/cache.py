@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+from expenses_app.store import KEY_COLUMNS, ExpenseStore
+
+
+CACHE_DIR_ENV = 'EXPENSES_APP_CACHE_DIR'
+MAX_ENTRIES = 64
+
+
+def portfolio_key(
+    expenses: ExpenseStore,
+    budget,
+    parameters,
+    start_date,
+    target_choice: str = 'Desejável',
+) -> str:
+    # Hashes the store's column buffers as they are, so the key costs a
+    # pass over a few arrays instead of building and encoding every expense.
+    digest = hashlib.sha256()
+    for name in KEY_COLUMNS:
+        column = expenses.column(name)
+        if name == 'description':
+            encoded = json.dumps(column, ensure_ascii=False).encode('utf-8')
+        else:
+            encoded = column.tobytes()
+        digest.update(encoded)
+        digest.update(b'\0')
+
+    settings = [
+        [
+            budget.initial,
+            budget.recorrent,
+            budget.recurrence,
+            budget.last_recurrence,
+            budget.iterations,
+        ],
+        [
+            parameters.priority_exponent,
+            parameters.deviation_weight,
+            parameters.max_time,
+        ],
+        start_date.isoformat(),
+        target_choice,
+    ]
+    digest.update(json.dumps(settings).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def portfolio_spends(portfolio) -> list[list[float]]:
+    return [list(expense.partial_spends) for expense in portfolio.expenses]
+
+
+def apply_spends(portfolio, spends: list[list[float]]):
+    for expense, values in zip(portfolio.expenses, spends):
+        expense.partial_spends = list(values)
+
+    return portfolio
+
+
+class ResultCache:
+    def __init__(
+        self, max_entries: int = MAX_ENTRIES, directory: Optional[str] = None
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: OrderedDict[str, list[list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.__prune()
+
+    @classmethod
+    def from_environment(cls) -> 'ResultCache':
+        return cls(directory=os.environ.get(CACHE_DIR_ENV) or None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> Optional[list[list[float]]]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        spends = self.__read(key)
+        if spends is not None:
+            self.__remember(key, spends)
+
+        return spends
+
+    def put(self, key: str, spends: list[list[float]]):
+        self.__remember(key, spends)
+        self.__write(key, spends)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __remember(self, key: str, spends: list[list[float]]):
+        with self._lock:
+            self._entries[key] = spends
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def __read(self, key: str) -> Optional[list[list[float]]]:
+        if self.directory is None:
+            return None
+        path = self.__path(key)
+        try:
+            with open(path, encoding='utf-8') as file:
+                spends = json.load(file)
+            # The modification time orders the files for __prune.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return spends
+
+    def __write(self, key: str, spends: list[list[float]]):
+        if self.directory is None:
+            return None
+        # Each write gets its own temporary file, so sessions storing the
+        # same key at once never write into each other's file.
+        try:
+            file = tempfile.NamedTemporaryFile(
+                'w',
+                encoding='utf-8',
+                dir=self.directory,
+                suffix='.tmp',
+                delete=False,
+            )
+        except OSError:
+            return None
+        try:
+            with file:
+                json.dump(spends, file)
+            os.replace(file.name, self.__path(key))
+        except OSError:
+            try:
+                os.remove(file.name)
+            except OSError:
+                pass
+        self.__prune()
+
+    def __prune(self):
+        # Keeps the files of the max_entries most recently used results,
+        # the same limit as the entries kept in memory.
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith('.json')
+            ]
+            entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+            for entry in entries[: max(len(entries) - self.max_entries, 0)]:
+                os.remove(entry.path)
+        except OSError:
+            pass
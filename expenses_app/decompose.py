@@ -0,0 +1,152 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+from expenses_app.arrays import PortfolioArrays
+from expenses_app.store import ExpenseStore
+from expenses_app.worker import MP_CONTEXT, solve_portfolio
+
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.portfolio import Budget
+    from expenses_opt.optimization.optimizer import OptmizationParameters
+
+
+# 'due_date' cuts the expenses, sorted by due date, into consecutive
+# windows; 'balanced' deals them out in turn so every part spans the whole
+# horizon. Each part gets the share of the budget its target prices ask for.
+STRATEGIES = ('due_date', 'balanced')
+
+
+@dataclass
+class Subproblem:
+    indices: list[int]
+    expenses: ExpenseStore
+    budget: 'Budget'
+
+
+@dataclass
+class SolutionQuality:
+    total_spend: float
+    deviation: float
+
+    def gap(self, reference: 'SolutionQuality') -> dict[str, float]:
+        # Relative difference to the reference (usually the monolithic
+        # solve); positive means more spent or a larger deviation.
+        def relative(value: float, base: float) -> float:
+            return (value - base) / base if base else 0.0
+
+        return {
+            'total_spend': relative(self.total_spend, reference.total_spend),
+            'deviation': relative(self.deviation, reference.deviation),
+        }
+
+
+def solution_quality(
+    spends: list[list[float]], targets: list[float]
+) -> SolutionQuality:
+    totals = np.array([sum(values) for values in spends], dtype=np.float64)
+    return SolutionQuality(
+        total_spend=round(float(totals.sum()), 2),
+        deviation=round(float(np.abs(totals - targets).sum()), 2),
+    )
+
+
+def scaled_budget(budget: 'Budget', share: float) -> 'Budget':
+    from expenses_opt.models.portfolio import Budget
+
+    return Budget(
+        initial=round(budget.initial * share, 2),
+        recorrent=round(budget.recorrent * share, 2),
+        recurrence=budget.recurrence,
+        last_recurrence=budget.last_recurrence,
+        iterations=budget.iterations,
+    )
+
+
+def split_portfolio(
+    expenses: ExpenseStore,
+    budget: 'Budget',
+    start_date: 'pendulum.DateTime',
+    parts: int,
+    strategy: str = 'due_date',
+    target_choice: str = 'Desejável',
+) -> list[Subproblem]:
+    if strategy not in STRATEGIES:
+        raise ValueError(f'Estratégia de divisão desconhecida: {strategy}')
+
+    arrays = PortfolioArrays.from_store(expenses, start_date, target_choice)
+    order = arrays.order('due_date')
+    parts = max(1, min(parts, len(order)))
+
+    if strategy == 'due_date':
+        groups = np.array_split(order, parts)
+    else:
+        groups = [order[start::parts] for start in range(parts)]
+
+    total_target = float(arrays.target.sum())
+    subproblems = []
+    for group in groups:
+        indices = np.sort(group).tolist()
+        share = (
+            float(arrays.target[group].sum()) / total_target
+            if total_target
+            else 1 / parts
+        )
+        subproblems.append(
+            Subproblem(
+                indices=indices,
+                expenses=expenses.take(indices),
+                budget=scaled_budget(budget, share),
+            )
+        )
+    return subproblems
+
+
+def solve_subproblem(
+    subproblem: Subproblem,
+    parameters: 'OptmizationParameters',
+    start_date: 'pendulum.DateTime',
+    target_choice: str,
+) -> list[list[float]]:
+    portfolio = subproblem.expenses.to_portfolio(
+        budget=subproblem.budget, target_choice=target_choice
+    )
+    solve_portfolio(portfolio, parameters, start_date)
+    return [list(expense.partial_spends) for expense in portfolio.expenses]
+
+
+def solve_decomposed(
+    expenses: ExpenseStore,
+    budget: 'Budget',
+    parameters: 'OptmizationParameters',
+    start_date: 'pendulum.DateTime',
+    parts: int,
+    strategy: str = 'due_date',
+    target_choice: str = 'Desejável',
+    max_workers: Optional[int] = None,
+) -> list[list[float]]:
+    # Returns the spends of every expense in the store's order. A part
+    # without a feasible solution makes the whole solve fail.
+    subproblems = split_portfolio(
+        expenses, budget, start_date, parts, strategy, target_choice
+    )
+    spends: list[Optional[list[float]]] = [None] * len(expenses)
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(subproblems))
+    with ProcessPoolExecutor(
+        max_workers=max(max_workers, 1), mp_context=MP_CONTEXT
+    ) as executor:
+        results = executor.map(
+            solve_subproblem,
+            subproblems,
+            [parameters] * len(subproblems),
+            [start_date] * len(subproblems),
+            [target_choice] * len(subproblems),
+        )
+        for subproblem, part_spends in zip(subproblems, results):
+            for index, values in zip(subproblem.indices, part_spends):
+                spends[index] = values
+
+    return spends
@@ -0,0 +1,134 @@
+import csv
+import os
+from typing import Iterable, Optional
+from expenses_opt.models.expense import Expense
+from expenses_opt.models.portfolio import Portfolio
+from expenses_app.store import ExpenseStore, date_from_ordinal
+
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+EXPENSE_COLUMNS = [
+    'description',
+    'minimum',
+    'maximum',
+    'target',
+    'priority',
+    'mandatory',
+    'due_date',
+]
+
+
+class ExportError(Exception):
+    pass
+
+
+def results_path(path: str) -> str:
+    root, extension = os.path.splitext(path)
+    return f'{root}_resultados{extension}'
+
+
+def format_date(date) -> str:
+    return f'{date.day:02d}/{date.month:02d}/{date.year}'
+
+
+def expense_columns(expenses: Iterable[Expense]) -> dict[str, list]:
+    expenses = list(expenses)
+    # Due dates repeat a lot, so each distinct one is formatted once.
+    dates = {}
+    for expense in expenses:
+        if expense.due_date not in dates:
+            dates[expense.due_date] = format_date(expense.due_date)
+
+    return {
+        'description': [expense.description for expense in expenses],
+        'minimum': [expense.range.minimum for expense in expenses],
+        'maximum': [expense.range.maximum for expense in expenses],
+        'target': [expense.range.target for expense in expenses],
+        'priority': [expense.priority.value for expense in expenses],
+        'mandatory': [expense.mandatory for expense in expenses],
+        'due_date': [dates[expense.due_date] for expense in expenses],
+    }
+
+
+def store_columns(store: ExpenseStore) -> dict[str, list]:
+    ordinals = store.column('due_date')
+    dates = {
+        ordinal: format_date(date_from_ordinal(ordinal))
+        for ordinal in set(ordinals)
+    }
+
+    return {
+        'description': list(store.column('description')),
+        'minimum': store.column('minimum').tolist(),
+        'maximum': store.column('maximum').tolist(),
+        'target': store.column('target').tolist(),
+        'priority': store.column('priority').tolist(),
+        'mandatory': [bool(value) for value in store.column('mandatory')],
+        'due_date': [dates[ordinal] for ordinal in ordinals],
+    }
+
+
+def result_columns(portfolio: Portfolio) -> dict[str, list]:
+    iterations = portfolio.budget.iterations
+    padding = [0.0] * iterations
+    spends = [
+        (list(expense.partial_spends) + padding)[:iterations]
+        for expense in portfolio.expenses
+    ]
+
+    columns = {
+        'description': [exp.description for exp in portfolio.expenses],
+        'total': [round(sum(row), 2) for row in spends],
+    }
+    for it, values in enumerate(zip(*spends)):
+        columns[f'period_{it + 1}'] = list(values)
+    return columns
+
+
+def write_csv(path: str, columns: dict[str, list]):
+    with open(
+        path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE
+    ) as file:
+        writer = csv.writer(file)
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*columns.values()))
+
+
+def write_parquet(path: str, columns: dict[str, list]):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError(
+            'Exportar para parquet requer o pacote pyarrow instalado'
+        )
+
+    pq.write_table(pa.table(columns), path)
+
+
+def write_columns(path: str, columns: dict[str, list]):
+    if path.lower().endswith('.parquet'):
+        write_parquet(path, columns)
+    else:
+        write_csv(path, columns)
+
+
+def export_expenses(
+    path: str,
+    expenses: Iterable[Expense],
+    portfolio: Optional[Portfolio] = None,
+) -> list[str]:
+    if isinstance(expenses, ExpenseStore):
+        columns = store_columns(expenses)
+    else:
+        columns = expense_columns(expenses)
+
+    write_columns(path, columns)
+    written = [path]
+
+    if portfolio is not None:
+        write_columns(results_path(path), result_columns(portfolio))
+        written.append(results_path(path))
+
+    return written
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+from expenses_app.arrays import PortfolioArrays, budget_income
+from expenses_app.store import ExpenseStore
+
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.portfolio import Budget
+
+
+# How many expenses a message names before summarizing the rest.
+MAX_NAMED = 5
+
+
+@dataclass
+class Shortfall:
+    period: int
+    required: float
+    available: float
+    expenses: list[tuple[str, float]]
+    others: int = 0
+
+
+@dataclass
+class FeasibilityReport:
+    shortfall: Optional[Shortfall] = None
+    invalid_ranges: list[str] = field(default_factory=list)
+    overdue: list[str] = field(default_factory=list)
+
+    @property
+    def feasible(self) -> bool:
+        return self.shortfall is None and not self.invalid_ranges
+
+    def messages(self, period_name: str = 'Período') -> list[str]:
+        messages = []
+        if self.invalid_ranges:
+            messages.append(
+                'Faixa de preço inválida (mínimo > máximo ou desejável fora '
+                'da faixa): ' + _names(self.invalid_ranges)
+            )
+        shortfall = self.shortfall
+        if shortfall is not None:
+            named = ', '.join(
+                f'{name} (R$ {minimum:.2f})'
+                for name, minimum in shortfall.expenses
+            )
+            if shortfall.others:
+                named += f' e mais {shortfall.others}'
+            messages.append(
+                f'Orçamento insuficiente em {period_name} '
+                f'{shortfall.period + 1}: os gastos obrigatórios com prazo '
+                f'até lá somam R$ {shortfall.required:.2f}, mas o orçamento '
+                f'acumulado é R$ {shortfall.available:.2f}. '
+                f'Maiores gastos envolvidos: {named}'
+            )
+        if self.overdue and not self.feasible:
+            messages.append(
+                'Gastos obrigatórios vencidos antes do início: '
+                + _names(self.overdue)
+            )
+        return messages
+
+
+def _names(names: list[str]) -> str:
+    text = ', '.join(names[:MAX_NAMED])
+    if len(names) > MAX_NAMED:
+        text += f' e mais {len(names) - MAX_NAMED}'
+    return text
+
+
+def check_feasibility(
+    expenses: ExpenseStore,
+    budget: 'Budget',
+    start_date: 'pendulum.DateTime',
+    target_choice: str = 'Desejável',
+) -> FeasibilityReport:
+    # Necessary conditions only: a report without problems does not mean
+    # the solver will find a solution, but any problem found here means it
+    # cannot.
+    report = FeasibilityReport()
+    if not len(expenses) or not budget.iterations:
+        return report
+
+    arrays = PortfolioArrays.from_store(expenses, start_date, target_choice)
+    descriptions = expenses.column('description')
+
+    invalid = np.flatnonzero(
+        (arrays.minimum > arrays.maximum)
+        | (arrays.target < arrays.minimum)
+        | (arrays.target > arrays.maximum)
+    )
+    report.invalid_ranges = [descriptions[i] for i in invalid]
+
+    overdue = np.flatnonzero(arrays.mandatory & (arrays.due_offset < 0))
+    report.overdue = [descriptions[i] for i in overdue]
+
+    required = np.cumsum(arrays.mandatory_minimums(budget))
+    available = np.cumsum(budget_income(budget))
+    short = np.flatnonzero(required > available + 1e-9)
+    if not len(short):
+        return report
+
+    period = int(short[0])
+    due = arrays.due_period(budget.recurrence, budget.iterations)
+    involved = np.flatnonzero(arrays.mandatory & (due <= period))
+    largest = involved[np.argsort(-arrays.minimum[involved], kind='stable')]
+    report.shortfall = Shortfall(
+        period=period,
+        required=float(required[period]),
+        available=float(available[period]),
+        expenses=[
+            (descriptions[i], float(arrays.minimum[i]))
+            for i in largest[:MAX_NAMED]
+        ],
+        others=max(len(largest) - MAX_NAMED, 0),
+    )
+    return report
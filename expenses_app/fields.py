@@ -0,0 +1,117 @@
+from typing import Any, Callable, Optional
+import flet as ft
+from expenses_app.constants import MAIN_GREEN
+
+INVALID_COLOR = ft.colors.RED_900
+
+
+class FormError(ValueError):
+    def __init__(self, errors: dict[str, str]):
+        # errors maps each field label to the reason it was rejected.
+        self.errors = errors
+        fields = '; '.join(
+            f'{label} ({reason})' for label, reason in errors.items()
+        )
+        super().__init__(f'Corrija os campos: {fields}')
+
+
+# A TextField together with the parser for its text. The text is parsed
+# when it changes and the result is kept, so submitting a form only parses
+# the fields edited since the last submit.
+class ParsedField:
+    def __init__(
+        self,
+        control: ft.TextField,
+        parser: Callable[[str], Any],
+        required: bool = True,
+        on_validity_change: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.control = control
+        self.parser = parser
+        self.required = required
+        self.on_validity_change = on_validity_change
+        self._raw: Optional[str] = None
+        self._value: Any = None
+        self._error: Optional[str] = None
+
+        self._on_change = control.on_change
+        control.on_change = self.handle_change
+
+    @property
+    def label(self) -> str:
+        return self.control.label
+
+    @property
+    def value(self) -> Any:
+        self.validate()
+        return self._value
+
+    @property
+    def error(self) -> Optional[str]:
+        self.validate()
+        return self._error
+
+    def handle_change(self, event=None):
+        was_valid = self._error is None
+        self.validate()
+        if (self._error is None) != was_valid and self.on_validity_change:
+            self.on_validity_change()
+        if self._on_change is not None:
+            self._on_change(event)
+
+    def validate(self) -> bool:
+        raw = (self.control.value or '').strip()
+        if raw == self._raw:
+            return self._error is None
+
+        self._raw = raw
+        self._value = None
+        self._error = None
+        if not raw:
+            if self.required:
+                self._error = 'campo obrigatório'
+        else:
+            try:
+                self._value = self.parser(raw)
+            except ValueError as err:
+                self._error = str(err) or 'valor inválido'
+
+        self.control.border_color = (
+            MAIN_GREEN if self._error is None else INVALID_COLOR
+        )
+        return self._error is None
+
+
+class FieldForm:
+    def __init__(self, **fields: ParsedField) -> None:
+        self.fields = fields
+
+    def __getitem__(self, name: str) -> ParsedField:
+        return self.fields[name]
+
+    def errors(self) -> dict[str, str]:
+        return {
+            field.label: field.error
+            for field in self.fields.values()
+            if not field.validate()
+        }
+
+    def values(self) -> dict[str, Any]:
+        errors = self.errors()
+        if errors:
+            raise FormError(errors)
+        return {name: field.value for name, field in self.fields.items()}
+
+
+def read_forms(*forms: FieldForm) -> dict[str, Any]:
+    # Values of every form, or a FormError naming every invalid field.
+    errors = {}
+    values = {}
+    for form in forms:
+        try:
+            values.update(form.values())
+        except FormError as err:
+            errors.update(err.errors)
+    if errors:
+        raise FormError(errors)
+    return values
@@ -0,0 +1,227 @@
+import asyncio
+import csv
+import io
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator, Optional
+from expenses_opt.models.expense import Expense, ExpenseRange
+from expenses_app.parsing import parse_amount, parse_date, parse_priority
+from expenses_app.store import priorities
+
+
+CHUNK_SIZE = 500
+
+COLUMN_ALIASES = {
+    'description': ('description', 'descricao', 'descrição', 'nome'),
+    'minimum': ('minimum', 'min', 'min_price', 'preço mínimo'),
+    'maximum': ('maximum', 'max', 'max_price', 'preço máximo'),
+    'target': ('target', 'target_price', 'preço desejável'),
+    'priority': ('priority', 'prioridade'),
+    'mandatory': ('mandatory', 'obrigatório', 'obrigatorio'),
+    'due_date': ('due_date', 'data limite', 'data_limite'),
+}
+
+BOOLEAN_VALUES = {
+    'sim': True,
+    's': True,
+    'true': True,
+    '1': True,
+    'não': False,
+    'nao': False,
+    'n': False,
+    'false': False,
+    '0': False,
+    '': False,
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportChunk:
+    expenses: list[Expense] = field(default_factory=list)
+    skipped: list[tuple[int, str]] = field(default_factory=list)
+    progress: float = 0.0
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: list[tuple[int, str]] = field(default_factory=list)
+    repeated: int = 0
+    # Files that could not be read at all, so they have no line number.
+    errors: list[str] = field(default_factory=list)
+
+    def add(self, chunk: ImportChunk, added: Optional[int] = None):
+        # added is how many of the chunk's expenses were new, when the
+        # caller deduplicated them.
+        if added is None:
+            added = len(chunk.expenses)
+        self.imported += added
+        self.repeated += len(chunk.expenses) - added
+        self.skipped.extend(chunk.skipped)
+
+    def summary(self, max_lines: int = 10) -> str:
+        message = f'{self.imported} gastos importados.'
+        if self.repeated:
+            message += f' {self.repeated} já existentes foram ignorados.'
+        if self.skipped:
+            message += f' {len(self.skipped)} linhas ignoradas:'
+            for line, reason in self.skipped[:max_lines]:
+                message += f'\nLinha {line}: {reason}'
+            if len(self.skipped) > max_lines:
+                message += f'\n... e mais {len(self.skipped) - max_lines}'
+        for error in self.errors:
+            message += f'\nArquivo não lido: {error}'
+        return message
+
+
+@dataclass
+class FileChunk:
+    path: str
+    chunk: Optional[ImportChunk] = None
+    # Set when the file could not be read; no chunks follow.
+    error: Optional[Exception] = None
+    # True on the last item of each file.
+    done: bool = False
+
+
+def parse_mandatory(value: str) -> bool:
+    try:
+        return BOOLEAN_VALUES[value.strip().lower()]
+    except KeyError:
+        raise RowError(f'valor de obrigatoriedade inválido "{value}"')
+
+
+def resolve_columns(header: list[str]) -> dict[str, int]:
+    normalized = [name.strip().lower() for name in header]
+    columns = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[key] = normalized.index(alias)
+                break
+        else:
+            raise ValueError(f'Coluna "{key}" não encontrada no arquivo')
+    return columns
+
+
+def parse_row(row: list[str], columns: dict[str, int]) -> Expense:
+    try:
+        values = {key: row[index] for key, index in columns.items()}
+    except IndexError:
+        raise RowError('número de colunas incorreto')
+
+    description = values['description'].strip()
+    if not description:
+        raise RowError('nome do gasto vazio')
+
+    try:
+        minimum = parse_amount(values['minimum'])
+        maximum = parse_amount(values['maximum'])
+        target = parse_amount(values['target'])
+    except ValueError:
+        raise RowError('preço inválido')
+
+    if not 0 <= minimum <= target <= maximum:
+        raise RowError('preços fora da ordem mínimo, desejável, máximo')
+
+    try:
+        due_date = parse_date(values['due_date'])
+    except ValueError:
+        raise RowError(f'data inválida "{values["due_date"]}"')
+
+    try:
+        priority = priorities()[parse_priority(values['priority'])]
+    except ValueError as err:
+        raise RowError(str(err))
+
+    return Expense(
+        description=description,
+        due_date=due_date,
+        priority=priority,
+        mandatory=parse_mandatory(values['mandatory']),
+        range=ExpenseRange(minimum=minimum, maximum=maximum, target=target),
+    )
+
+
+def iter_expense_chunks(
+    path: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[ImportChunk]:
+    size = os.path.getsize(path) or 1
+
+    with open(path, 'rb') as raw:
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        sample = stream.read(4096)
+        stream.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;')
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.reader(stream, dialect)
+        columns = resolve_columns(next(reader, []))
+
+        chunk = ImportChunk()
+        for row in reader:
+            if not any(row):
+                continue
+            try:
+                chunk.expenses.append(parse_row(row, columns))
+            except RowError as err:
+                chunk.skipped.append((reader.line_num, str(err)))
+
+            if len(chunk.expenses) + len(chunk.skipped) >= chunk_size:
+                chunk.progress = min(raw.tell() / size, 1.0)
+                yield chunk
+                chunk = ImportChunk()
+
+        chunk.progress = 1.0
+        yield chunk
+
+
+async def read_files(
+    paths: list[str], chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[FileChunk]:
+    # Parses every file on a thread of its own and yields the chunks of all
+    # of them as they are ready, so a slow file does not hold up the others.
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[FileChunk] = asyncio.Queue(maxsize=2 * len(paths))
+    stopped = threading.Event()
+
+    def put(item: FileChunk):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def produce(path: str):
+        try:
+            for chunk in iter_expense_chunks(path, chunk_size):
+                if stopped.is_set():
+                    return None
+                put(FileChunk(path=path, chunk=chunk))
+            put(FileChunk(path=path, done=True))
+        except Exception as err:
+            # Any failure ends the file; the consumer would otherwise wait
+            # for it forever.
+            put(FileChunk(path=path, error=err, done=True))
+
+    producers = [
+        asyncio.ensure_future(asyncio.to_thread(produce, path))
+        for path in paths
+    ]
+    remaining = len(paths)
+    try:
+        while remaining:
+            item = await queue.get()
+            remaining -= item.done
+            yield item
+    finally:
+        # A consumer that stops early must not leave a producer blocked on
+        # the full queue.
+        stopped.set()
+        while not all(producer.done() for producer in producers):
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
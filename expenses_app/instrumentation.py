@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+METRICS_LOG_ENV = 'EXPENSES_APP_METRICS_LOG'
+METRICS_PORT_ENV = 'EXPENSES_APP_METRICS_PORT'
+RECENT_EVENTS = 200
+
+logger = logging.getLogger('expenses_app.metrics')
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    last: float = 0.0
+    controls: int = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+def watch_update_size(page) -> threading.local:
+    # Flet builds the diff of each page.update in a private Page method, on
+    # the thread that calls update. The wrapper keeps, per thread, how many
+    # controls the last update sent: the ones added and the ones whose
+    # attributes changed. Pages without that method report nothing.
+    sizes = threading.local()
+    prepare = getattr(page, '_Page__prepare_update', None)
+    if prepare is None:
+        return sizes
+
+    def prepare_update(*controls):
+        commands, added, removed = prepare(*controls)
+        sizes.controls = len(added) + sum(
+            1 for command in commands if command.name == 'set'
+        )
+        return commands, added, removed
+
+    page._Page__prepare_update = prepare_update
+    return sizes
+
+
+# Every session has a tracer of its own, so its panel only shows its own
+# actions; the exporter reads all of them, labelled by session.
+class Tracer:
+    def __init__(self, session: str = '', recent: int = RECENT_EVENTS) -> None:
+        self.session = session
+        self.stats: dict[str, SpanStats] = dict()
+        self.recent: deque[dict] = deque(maxlen=recent)
+        self._lock = threading.Lock()
+        _tracers.add(self)
+
+    def record(self, name: str, seconds: float, **fields: Any):
+        event = {
+            'session': self.session,
+            'span': name,
+            'seconds': round(seconds, 6),
+            **fields,
+        }
+        with self._lock:
+            stats = self.stats.setdefault(name, SpanStats())
+            stats.count += 1
+            stats.total += seconds
+            stats.maximum = max(stats.maximum, seconds)
+            stats.last = seconds
+            stats.controls += fields.get('controls', 0)
+            self.recent.append(event)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(event, ensure_ascii=False))
+
+    @contextmanager
+    def span(self, name: str, **fields: Any):
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def snapshot(self) -> dict[str, SpanStats]:
+        with self._lock:
+            return {
+                name: SpanStats(**vars(stats))
+                for name, stats in self.stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.recent.clear()
+
+    def close(self):
+        _tracers.discard(self)
+
+
+_tracers: 'weakref.WeakSet[Tracer]' = weakref.WeakSet()
+
+
+def traced(name: str):
+    # For methods of objects that keep their tracer in self.tracer.
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render_prometheus() -> str:
+    lines = [
+        '# TYPE expenses_app_span_seconds summary',
+        '# TYPE expenses_app_span_seconds_max gauge',
+        '# TYPE expenses_app_update_controls_total counter',
+    ]
+    for tracer in sorted(list(_tracers), key=lambda t: t.session):
+        for name, stats in sorted(tracer.snapshot().items()):
+            label = f'{{session="{tracer.session}",span="{name}"}}'
+            lines.append(
+                f'expenses_app_span_seconds_sum{label} {stats.total}'
+            )
+            lines.append(
+                f'expenses_app_span_seconds_count{label} {stats.count}'
+            )
+            lines.append(
+                f'expenses_app_span_seconds_max{label} {stats.maximum}'
+            )
+            if stats.controls:
+                lines.append(
+                    f'expenses_app_update_controls_total{label} '
+                    f'{stats.controls}'
+                )
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def configure_from_environment():
+    global _server
+
+    log_path = os.environ.get(METRICS_LOG_ENV)
+    if log_path and not logger.handlers:
+        handler = logging.FileHandler(log_path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port and _server is None:
+        _server = ThreadingHTTPServer(('', int(port)), MetricsHandler)
+        threading.Thread(
+            target=_server.serve_forever, name='metrics-server', daemon=True
+        ).start()
@@ -1,38 +1,116 @@
-import flet as ft
-import json
+import asyncio
 import csv
-from copy import copy, deepcopy
-import pendulum
-from expenses_opt.models.expense import (
-    Expense,
-    ExpenseRange,
-    build_expenses_from_csv,
+import flet as ft
+import os
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Optional
+from expenses_app.aio import io_loop
+from expenses_app.cache import (
+    ResultCache,
+    apply_spends,
+    portfolio_key,
+    portfolio_spends,
 )
-from expenses_opt.models.portfolio import Budget, Portfolio
-from expenses_opt.optimization.optimizer import (
-    Optimizer,
-    OptmizationParameters,
+from expenses_app.fields import FieldForm, FormError, ParsedField, read_forms
+from expenses_app.instrumentation import (
+    Tracer,
+    configure_from_environment,
+    traced,
+    watch_update_size,
 )
-from expenses_opt.exceptions import (
-    InfeasibleProblemException,
-    InvalidDataException,
+from expenses_app.models import MetricsPanel, MyButton, MyDivider, MyText
+from expenses_app.notifications import Notifier
+from expenses_app.parsing import (
+    at_least,
+    parse_amount,
+    parse_date,
+    parse_integer,
+    parse_priority,
+)
+from expenses_app.render import RenderScheduler, batched
+from expenses_app.persistence import PortfolioDatabase, RunRecord
+from expenses_app.pipeline import (
+    RECURRENCE_DAYS,
+    TARGET_CHOICES,
+    build_budget,
+    build_parameters,
+)
+from expenses_app.store import (
+    ExpenseRecord,
+    ExpenseStore,
+    ExpenseView,
+    StoreFullError,
+    date_from_ordinal,
+)
+from expenses_app.table import PaginatedTable, ResultsTable
+from expenses_app.watcher import WATCH_DIR_ENV, FolderWatcher
+from expenses_app.worker import (
+    JobStatus,
+    OptimizationJob,
+    OptimizationWorker,
+    PoolSaturatedError,
+    SolverPool,
 )
-from expenses_opt.constants import Priority
-from expenses_app.models import MyButton, MyDivider, MyText
-
 
-def str_2_float(value: str):
-    return round(float(value.strip().replace('.', '').replace(',', '.')), 2)
+# The optimizer stack and pendulum are only needed once the user imports a
+# file or optimizes, so they are imported inside those handlers to keep the
+# first frame fast.
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.portfolio import Budget, Portfolio
+    from expenses_app.sweep import ScenarioResult
 
 
-def date_2_string(date: pendulum.Date):
+def date_2_string(date: 'pendulum.Date'):
     return f'{date.day}/{date.month}/{date.year}'
 
 
+PRIORITY_NAMES = {1: 'Alta', 2: 'Média', 3: 'Baixa'}
+PERIOD_NAMES = {'Mensal': 'Mês', 'Quinzenal': 'Quinzena', 'Semanal': 'Semana'}
+RECURRENCE_NAMES = {days: name for name, days in RECURRENCE_DAYS.items()}
+
+
+def expense_to_row(record: ExpenseRecord) -> list[str]:
+    return [
+        record.description,
+        f'R$ {record.minimum}',
+        f'R$ {record.maximum}',
+        f'R$ {record.target}',
+        PRIORITY_NAMES[record.priority],
+        'Sim' if record.mandatory else 'Não',
+        date_2_string(date_from_ordinal(record.due_date)),
+    ]
+
+
 class Aplication:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        solver_pool: Optional[SolverPool] = None,
+        max_pending: Optional[int] = None,
+        max_expenses_bytes: Optional[int] = None,
+        database: Optional[PortfolioDatabase] = None,
+        watch_dir: Optional[str] = None,
+    ) -> None:
         self.page: ft.Page = None
-        self.expenses_data: list[Expense] = list()
+        self.expenses_data = ExpenseStore(max_bytes=max_expenses_bytes)
+        self.database = database
+        # Manual and watched-folder imports append to the same store.
+        self.import_lock = threading.Lock()
+        self.watcher = (
+            FolderWatcher(watch_dir, on_files=self.handle_watched_files)
+            if watch_dir
+            else None
+        )
+        self.portfolio_name: Optional[str] = None
+        self.saved_runs: dict[str, RunRecord] = dict()
+        self.latest_portfolio: 'Portfolio' = None
+        # Window the latest result was solved with, not the one in the form.
+        self.latest_window: Optional[int] = None
+        self.result_cache = ResultCache.from_environment()
+        self.tracer = Tracer()
+        self.renderer = RenderScheduler(flush=self.update_page)
+        self.notifier = Notifier()
         self.file_picker = ft.FilePicker(on_result=self.handle_import)
         self.file_export = ft.FilePicker(on_result=self.handle_export)
 
@@ -41,19 +119,75 @@ class Aplication:
         self.build_expenses_controls()
         self.build_budget_controls()
         self.build_optimization_controls()
+        self.build_forms()
+
+        self.input_history = ft.Dropdown(
+            label='Execuções anteriores',
+            options=[],
+            border_color=ft.colors.GREEN_600,
+            width=600,
+            visible=False,
+            on_change=lambda _: self.show_saved_run(),
+        )
+        self.results_table = ResultsTable(
+            request_update=self.renderer.mark_dirty,
+            border=ft.border.all(2, ft.colors.PURPLE_900),
+            border_radius=10,
+            vertical_lines=ft.border.BorderSide(1, ft.colors.PURPLE_900),
+            horizontal_lines=ft.border.BorderSide(1, ft.colors.GREEN_900),
+        )
 
         self.opt_button = MyButton(
             text='Otimizar', on_click=lambda _: self.call_optimization()
         )
+        self.build_progress_controls()
+
+        self.sweep_toggle_button = MyButton(
+            text='Varredura de parâmetros',
+            on_click=lambda _: self.toggle_sweep_section(),
+            icon=ft.icons.TUNE,
+        )
+        self.sweep_section = ft.Column(controls=[], visible=False)
+
+        self.metrics_panel = MetricsPanel(right=10, bottom=80, width=560)
+        self.metrics_button = ft.FloatingActionButton(
+            icon=ft.icons.SPEED,
+            tooltip='Desempenho',
+            on_click=lambda _: self.toggle_metrics_panel(),
+        )
+
+        self.optimization_worker = OptimizationWorker(
+            on_progress=lambda _: self.refresh_optimization_status(),
+            pool=solver_pool,
+            max_pending=max_pending,
+        )
+        # A sweep starts its own process pool, which would get around the
+        # solver slots shared by the sessions of a web deployment.
+        # The same goes for solving a portfolio in parts or window by
+        # window, which run next to the session instead of in a slot.
+        self.sweep_toggle_button.visible = solver_pool is None
+        self.input_opt_container3.visible = solver_pool is None
+        self.input_opt_container4.visible = solver_pool is None
+
+    def build_progress_controls(self):
+        self.opt_progress = ft.ProgressBar(
+            width=400, color=ft.colors.GREEN_600, visible=False
+        )
+        self.opt_status = ft.Text(value='', color=ft.colors.DEEP_PURPLE_500)
+        self.cancel_button = MyButton(
+            text='Cancelar',
+            on_click=lambda _: self.cancel_optimization(),
+            icon=ft.icons.CANCEL,
+            visible=False,
+        )
+        self.opt_progress_container = ft.Row(
+            controls=[self.opt_progress, self.opt_status, self.cancel_button]
+        )
 
     def build_optimization_controls(self):
         self.input_opt_target_choice = ft.Dropdown(
             label='Se aproximar do preço',
-            options=[
-                ft.dropdown.Option('Desejável'),
-                ft.dropdown.Option('Mínimo'),
-                ft.dropdown.Option('Máximo'),
-            ],
+            options=[ft.dropdown.Option(choice) for choice in TARGET_CHOICES],
             border_color=ft.colors.GREEN_600,
             value='Desejável',
         )
@@ -88,6 +222,144 @@ class Aplication:
             ]
         )
 
+        self.input_opt_parts = ft.TextField(
+            label='Dividir em partes',
+            border_color=ft.colors.GREEN_600,
+            hint_text='1 otimiza o portfólio inteiro',
+            value='1',
+        )
+        self.input_opt_strategy = ft.Dropdown(
+            label='Divisão',
+            options=[
+                ft.dropdown.Option(key='due_date', text='Por prazo'),
+                ft.dropdown.Option(key='balanced', text='Balanceada'),
+            ],
+            border_color=ft.colors.GREEN_600,
+            value='due_date',
+        )
+        self.input_opt_container3 = ft.Row(
+            controls=[self.input_opt_parts, self.input_opt_strategy]
+        )
+
+        self.input_opt_window = ft.TextField(
+            label='Janela (períodos)',
+            border_color=ft.colors.GREEN_600,
+            hint_text='Vazio otimiza todos os períodos juntos',
+        )
+        self.input_opt_overlap = ft.TextField(
+            label='Sobreposição (períodos)',
+            border_color=ft.colors.GREEN_600,
+            value='0',
+        )
+        self.input_opt_current_window = ft.Checkbox(
+            label='Mostrar só a janela atual',
+            value=False,
+            on_change=lambda _: self.refresh_results(),
+        )
+        self.input_opt_container4 = ft.Row(
+            controls=[
+                self.input_opt_window,
+                self.input_opt_overlap,
+                self.input_opt_current_window,
+            ]
+        )
+
+    def build_forms(self):
+        def field(control, parser, required=True):
+            return ParsedField(
+                control,
+                parser,
+                required=required,
+                on_validity_change=self.renderer.mark_dirty,
+            )
+
+        self.expense_form = FieldForm(
+            minimum=field(self.input_expense_min, parse_amount),
+            maximum=field(self.input_expense_max, parse_amount),
+            target=field(self.input_expense_target, parse_amount),
+            due_date=field(self.input_expense_due_date, parse_date),
+        )
+        self.filter_form = FieldForm(
+            due_before=field(self.input_filter_due, parse_date, False),
+        )
+        self.budget_form = FieldForm(
+            initial=field(self.input_budget_initial, parse_amount),
+            recorrent=field(self.input_budget_recorrent, parse_amount),
+            last_recurrence=field(
+                self.input_budget_last_recorrence, parse_date
+            ),
+            iterations=field(
+                self.input_budget_number_of_iterations, at_least(1)
+            ),
+        )
+        self.parameters_form = FieldForm(
+            start_date=field(self.input_opt_start_date, parse_date),
+            exponent=field(self.input_opt_exponent, parse_integer),
+            max_time=field(self.input_opt_max_time, parse_integer),
+            weight=field(self.input_opt_weight, parse_integer),
+        )
+        self.horizon_form = FieldForm(
+            parts=field(self.input_opt_parts, at_least(1)),
+            window=field(self.input_opt_window, at_least(1), required=False),
+            overlap=field(self.input_opt_overlap, at_least(0)),
+        )
+
+    def build_sweep_controls(self):
+        self.input_sweep_exponents = ft.TextField(
+            label='Expoentes de prioridade',
+            border_color=ft.colors.GREEN_600,
+            hint_text='2; 3; 4 ou 2:6:1',
+            value='2',
+        )
+        self.input_sweep_weights = ft.TextField(
+            label='Pesos do desvio',
+            border_color=ft.colors.GREEN_600,
+            hint_text='0; 0,5; 1 ou 0:1:0,25',
+            value='0',
+        )
+        self.input_sweep_targets = [
+            ft.Checkbox(label=choice, value=choice == 'Desejável')
+            for choice in TARGET_CHOICES
+        ]
+        self.input_sweep_recurrences = [
+            ft.Checkbox(label=recurrence, value=recurrence == 'Mensal')
+            for recurrence in RECURRENCE_DAYS
+        ]
+        self.sweep_button = MyButton(
+            text='Executar varredura',
+            on_click=lambda _: self.call_parameter_sweep(),
+        )
+        self.sweep_status = ft.Text(value='', color=ft.colors.DEEP_PURPLE_500)
+        self.sweep_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text(value='Expoente', weight='bold')),
+                ft.DataColumn(ft.Text(value='Peso', weight='bold')),
+                ft.DataColumn(ft.Text(value='Preço alvo', weight='bold')),
+                ft.DataColumn(ft.Text(value='Recorrência', weight='bold')),
+                ft.DataColumn(
+                    ft.Text(value='Total gasto', weight='bold'), numeric=True
+                ),
+                ft.DataColumn(
+                    ft.Text(value='Desvio do desejável', weight='bold'),
+                    numeric=True,
+                ),
+            ],
+            border=ft.border.all(2, ft.colors.PURPLE_900),
+            border_radius=10,
+            vertical_lines=ft.border.BorderSide(1, ft.colors.PURPLE_900),
+            horizontal_lines=ft.border.BorderSide(1, ft.colors.GREEN_900),
+        )
+
+        self.input_sweep_container1 = ft.Row(
+            controls=[self.input_sweep_exponents, self.input_sweep_weights]
+        )
+        self.input_sweep_container2 = ft.Row(
+            controls=self.input_sweep_targets + self.input_sweep_recurrences
+        )
+        self.sweep_progress_container = ft.Row(
+            controls=[self.sweep_button, self.sweep_status]
+        )
+
     def build_budget_controls(self):
         self.input_budget_initial = ft.TextField(
             label='Orçamento inicial',
@@ -192,7 +464,64 @@ class Aplication:
             ]
         )
 
-        self.expenses_table = ft.DataTable(
+        self.input_sort = ft.Dropdown(
+            label='Ordenar por',
+            options=[
+                ft.dropdown.Option(key='position', text='Inclusão'),
+                ft.dropdown.Option(key='due_date', text='Data limite'),
+                ft.dropdown.Option(key='priority', text='Prioridade'),
+                ft.dropdown.Option(key='mandatory', text='Obrigatório'),
+            ],
+            border_color=ft.colors.GREEN_600,
+            value='position',
+            on_change=lambda _: self.change_expenses_view(),
+        )
+        self.input_sort_descending = ft.Checkbox(
+            label='Decrescente',
+            value=False,
+            on_change=lambda _: self.change_expenses_view(),
+        )
+        self.input_filter_priority = ft.Dropdown(
+            label='Prioridade',
+            options=[ft.dropdown.Option('Todas')]
+            + [ft.dropdown.Option(name) for name in PRIORITY_NAMES.values()],
+            border_color=ft.colors.GREEN_600,
+            value='Todas',
+            on_change=lambda _: self.change_expenses_view(),
+        )
+        self.input_filter_mandatory = ft.Dropdown(
+            label='Obrigatório',
+            options=[
+                ft.dropdown.Option('Todos'),
+                ft.dropdown.Option('Sim'),
+                ft.dropdown.Option('Não'),
+            ],
+            border_color=ft.colors.GREEN_600,
+            value='Todos',
+            on_change=lambda _: self.change_expenses_view(),
+        )
+        self.input_filter_due = ft.TextField(
+            label='Vence antes de',
+            border_color=ft.colors.GREEN_600,
+            hint_text='DD/MM/AAAA',
+            on_change=lambda _: self.change_expenses_view(),
+        )
+        self.expenses_view_controls = ft.Row(
+            controls=[
+                self.input_sort,
+                self.input_sort_descending,
+                self.input_filter_priority,
+                self.input_filter_mandatory,
+                self.input_filter_due,
+            ]
+        )
+
+        self.editing_id: Optional[int] = None
+        self.expenses_table = PaginatedTable(
+            source=ExpenseView(self.expenses_data),
+            row_builder=expense_to_row,
+            request_update=self.renderer.mark_dirty,
+            on_select=self.select_expense,
             columns=[
                 ft.DataColumn(ft.Text(value='Nome', weight='bold')),
                 ft.DataColumn(
@@ -218,6 +547,29 @@ class Aplication:
         self.add_button = MyButton(
             text='Adicionar Gasto', on_click=lambda _: self.add_expense()
         )
+        self.update_button = MyButton(
+            text='Salvar alteração',
+            on_click=lambda _: self.update_expense(),
+            icon=ft.icons.SAVE,
+        )
+        self.delete_button = MyButton(
+            text='Excluir gasto',
+            on_click=lambda _: self.delete_expense(),
+            icon=ft.icons.DELETE,
+        )
+        self.cancel_edit_button = MyButton(
+            text='Cancelar edição',
+            on_click=lambda _: self.select_expense(None),
+            icon=ft.icons.CANCEL,
+        )
+        self.edit_buttons = ft.Row(
+            controls=[
+                self.update_button,
+                self.delete_button,
+                self.cancel_edit_button,
+            ],
+            visible=False,
+        )
 
         self.import_csv_button = MyButton(
             text='Importar aquivo csv',
@@ -225,133 +577,168 @@ class Aplication:
             icon=ft.icons.UPLOAD_FILE,
         )
 
+        self.import_progress = ft.ProgressBar(
+            width=400, color=ft.colors.GREEN_600, visible=False
+        )
+        self.import_status = ft.Text(value='', color=ft.colors.DEEP_PURPLE_500)
+        self.import_progress_container = ft.Row(
+            controls=[self.import_progress, self.import_status]
+        )
+
         self.export_csv_button = MyButton(
             text='Exportar para csv',
             on_click=lambda _: self.export_from_csv(),
             icon=ft.icons.IMPORT_EXPORT,
         )
 
-    def __parse_info_to_expense(
-        self,
-        price_map: dict,
-        name: str,
-        due_date: pendulum.Date,
-        mandatory: bool = False,
-        priority: str = 'Baixa',
-    ):
-        exp_range = ExpenseRange(
-            minimum=price_map['min_price']['value'],
-            maximum=price_map['max_price']['value'],
-            target=price_map['target_price']['value'],
-        )
-
-        priority_map = {
-            'ALTA': Priority.HIGHT,
-            'MÉDIA': Priority.MEDIUM,
-            'BAIXA': Priority.LOW,
-        }
-
-        expense = Expense(
-            description=name,
-            due_date=due_date,
-            priority=priority_map[priority.upper()],
-            mandatory=mandatory,
-            range=exp_range,
-        )
-
-        return expense
-
-    def __validate_input_date(self, my_input: ft.TextField):
-        raw_value = my_input.value
+    def read_forms(self, *forms: FieldForm) -> Optional[dict]:
         try:
-            due_date = pendulum.from_format(string=raw_value, fmt='DD/MM/YYYY')
-            return due_date
-        except ValueError:
-            my_input.border_color = ft.colors.RED_900
+            return read_forms(*forms)
+        except FormError as err:
+            self.pop_alert(str(err))
             return None
 
-    def __validate_numeric_fields(
-        self, values_map: dict, error_msg: str, is_int: bool = False
-    ):
-        for info in values_map.values():
-            my_input: ft.TextField = info['input']
-            try:
-                value = str_2_float(my_input.value)
-                if is_int:
-                    value = int(value)
-                info['value'] = value
-                my_input.border_color = ft.colors.GREEN_600
-            except ValueError:
-                my_input.border_color = ft.colors.RED_900
-                self.pop_alert(message=error_msg)
-                raise ValueError(error_msg)
-
     def pop_alert(self, message: str):
-        dlg = ft.AlertDialog(title=ft.Text(message))
-        self.page.add(dlg)
-        dlg.open = True
-        self.page.update()
+        self.notifier.notify(message)
+        self.renderer.mark_dirty()
+
+    def update_page(self):
+        with self.tracer.span('page.update') as fields:
+            if self.metrics_panel.visible:
+                self.metrics_panel.show_stats(self.tracer.snapshot())
+            self.update_size.controls = 0
+            self.page.update()
+            fields['controls'] = self.update_size.controls
+
+    def toggle_metrics_panel(self):
+        self.metrics_panel.visible = not self.metrics_panel.visible
+        self.renderer.mark_dirty()
 
     def main(self, page: ft.Page):
         self.page = page
+        self.tracer.session = page.session_id
+        self.update_size = watch_update_size(page)
         self.run()
 
+    @traced('add_expense')
+    @batched
     def add_expense(self):
+        row = self.read_expense_form()
+        if row is None:
+            return None
+
+        with self.import_lock:
+            try:
+                self.expenses_data.append_row(**row)
+            except StoreFullError as err:
+                self.pop_alert(str(err))
+                return None
+            self.save_expenses(start=len(self.expenses_data) - 1)
+
+        self.refresh_expenses_view()
+        self.expenses_table.go_to_last()
+        self.clear_expenses_fields()
 
-        price_map = {
-            'min_price': {'value': None, 'input': self.input_expense_min},
-            'max_price': {'value': None, 'input': self.input_expense_max},
-            'target_price': {
-                'value': None,
-                'input': self.input_expense_target,
-            },
+    def read_expense_form(self) -> Optional[dict]:
+        # Column values of the expense in the form, as ExpenseStore takes
+        # them.
+        values = self.read_forms(self.expense_form)
+        if values is None:
+            return None
+        return {
+            'description': self.input_expense_name.value,
+            'minimum': values['minimum'],
+            'maximum': values['maximum'],
+            'target': values['target'],
+            'priority': parse_priority(self.input_expense_priority.value),
+            'mandatory': bool(self.input_expense_mandatory.value),
+            'due_date': values['due_date'].toordinal(),
         }
 
-        try:
-            self.__validate_numeric_fields(
-                price_map, 'Campo de preço inválido'
+    @batched
+    def select_expense(self, record: Optional[ExpenseRecord]):
+        # Clicking a row loads it into the form for editing; clicking it
+        # again or cancelling goes back to adding.
+        self.editing_id = None if record is None else record.id
+        self.expenses_table.selected = record
+        self.edit_buttons.visible = record is not None
+        self.add_button.visible = record is None
+
+        if record is None:
+            self.clear_expenses_fields()
+        else:
+            self.input_expense_name.value = record.description
+            self.input_expense_min.value = str(record.minimum)
+            self.input_expense_max.value = str(record.maximum)
+            self.input_expense_target.value = str(record.target)
+            self.input_expense_priority.value = PRIORITY_NAMES[
+                record.priority
+            ]
+            self.input_expense_mandatory.value = record.mandatory
+            self.input_expense_due_date.value = date_2_string(
+                date_from_ordinal(record.due_date)
             )
-        except ValueError:
+        self.expenses_table.refresh()
+        self.renderer.mark_dirty()
+
+    @traced('update_expense')
+    @batched
+    def update_expense(self):
+        row = self.read_expense_form()
+        if row is None or self.editing_id is None:
             return None
 
-        name = self.input_expense_name.value
-        min_price = f"R$ {price_map['min_price']['value']}"
-        max_price = f"R$ {price_map['max_price']['value']}"
-        target_price = f"R$ {price_map['target_price']['value']}"
-        priority = self.input_expense_priority.value
-        mandatory = 'Sim' if self.input_expense_mandatory.value else 'Não'
-        due_date = self.__validate_input_date(
-            my_input=self.input_expense_due_date
-        )
+        with self.import_lock:
+            position = self.expenses_data.update(self.editing_id, **row)
+            self.persist_rows([position])
+        self.refresh_expenses_view()
+        self.select_expense(None)
 
-        if due_date is None:
-            self.pop_alert(message='Data no formato inválido!')
+    @traced('delete_expense')
+    @batched
+    def delete_expense(self):
+        if self.editing_id is None:
             return None
 
-        new_row = ft.DataRow(
-            cells=[
-                ft.DataCell(ft.Text(value=name)),
-                ft.DataCell(ft.Text(value=min_price)),
-                ft.DataCell(ft.Text(value=max_price)),
-                ft.DataCell(ft.Text(value=target_price)),
-                ft.DataCell(ft.Text(value=priority)),
-                ft.DataCell(ft.Text(value=mandatory)),
-                ft.DataCell(ft.Text(value=str(due_date))),
-            ]
-        )
-        self.expenses_table.rows.append(new_row)
-        self.page.update()
-
-        expense = self.__parse_info_to_expense(
-            price_map=price_map,
-            name=name,
-            due_date=due_date,
-            mandatory=self.input_expense_mandatory.value,
-            priority=self.input_expense_priority.value,
-        )
-
-        self.expenses_data.append(expense)
-        self.clear_expenses_fields()
+        with self.import_lock:
+            position, moved = self.expenses_data.delete(self.editing_id)
+            self.persist_rows([position] if moved else [])
+        self.refresh_expenses_view()
+        self.select_expense(None)
+
+    def expenses_query(self) -> Optional[dict]:
+        # Arguments for ExpenseStore.query, or None to show every expense
+        # in store order.
+        query = {}
+        if self.input_sort.value != 'position':
+            query['order_by'] = self.input_sort.value
+        if self.input_sort_descending.value:
+            query['descending'] = True
+        if self.input_filter_priority.value != 'Todas':
+            query['priority'] = parse_priority(
+                self.input_filter_priority.value
+            )
+        if self.input_filter_mandatory.value != 'Todos':
+            query['mandatory'] = self.input_filter_mandatory.value == 'Sim'
+        due_before = self.filter_form['due_before'].value
+        if due_before is not None:
+            query['due_before'] = due_before.toordinal()
+        return query or None
+
+    def refresh_expenses_view(self):
+        # Called after every change to the store, so the table follows it
+        # under the current filter and order.
+        query = self.expenses_query()
+        positions = None
+        if query is not None:
+            positions = self.expenses_data.query(**query)
+        self.expenses_table.source = ExpenseView(self.expenses_data, positions)
+        self.expenses_table.refresh()
+
+    @batched
+    def change_expenses_view(self):
+        self.refresh_expenses_view()
+        self.expenses_table.go_to(0)
 
     def clear_expenses_fields(self):
         fields: list[ft.TextField] = [
@@ -365,70 +752,325 @@ class Aplication:
         for field in fields:
             field.value = ''
 
-        self.page.update()
+        self.renderer.mark_dirty()
 
     def import_from_csv(self):
         self.file_picker.pick_files(allowed_extensions=['csv'])
 
     def export_from_csv(self):
         self.file_export.save_file(
-            file_name='gastos.csv',
-            allowed_extensions=['csv'])
+            file_name='gastos.csv', allowed_extensions=['csv', 'parquet']
+        )
 
     def handle_import(self, event: ft.FilePickerResultEvent):
-        for file in event.files:
-
-            expenses = build_expenses_from_csv(path=file.path)
-            self.expenses_data.extend(expenses)
-            for expense in expenses:
-                self.add_expense_in_table(expense)
-
-        self.page.update()
-    
-    def handle_export(self, event):
-        print(self.file_export.result.path)
-
-    def add_expense_in_table(self, expense: Expense):
-        priority_map = {1: 'Alta', 2: 'Média', 3: 'Baixa'}
-        priority = priority_map[expense.priority.value]
-        mandatory = 'Sim' if expense.mandatory else 'Não'
-        new_row = ft.DataRow(
-            cells=[
-                ft.DataCell(ft.Text(value=expense.description)),
-                ft.DataCell(ft.Text(value=f'R$ {expense.range.minimum}')),
-                ft.DataCell(ft.Text(value=f'R$ {expense.range.maximum}')),
-                ft.DataCell(ft.Text(value=f'R$ {expense.range.target}')),
-                ft.DataCell(ft.Text(value=priority)),
-                ft.DataCell(ft.Text(value=mandatory)),
-                ft.DataCell(ft.Text(value=date_2_string(expense.due_date))),
-            ]
+        # Returns the future of the import, which runs on the I/O loop.
+        if not event.files:
+            return None
+        return io_loop.submit(
+            self.import_files([file.path for file in event.files])
         )
-        self.expenses_table.rows.append(new_row)
 
-    def call_optimization(self):
+    async def import_files(self, paths: list[str]):
+        # The loop is shared by every import, export and session, so it only
+        # waits here: store writes and page updates go to worker threads.
+        from expenses_app.importer import ImportReport, read_files
+
+        reports = {path: ImportReport() for path in paths}
+        progress = dict.fromkeys(paths, 0.0)
+        finished = 0
+        await asyncio.to_thread(
+            self.show_import_progress,
+            0,
+            status=f'Importando {len(paths)} arquivo(s)...',
+        )
 
-        portfolio = self.run_optimization()
-        self.show_optimization_results(portfolio=portfolio)
+        # The lock is taken on a worker thread so that waiting for another
+        # import does not block the loop.
+        await asyncio.to_thread(self.import_lock.acquire)
+        try:
+            with self.tracer.span('import') as fields:
+                fields['files'] = len(paths)
+                first_new = len(self.expenses_data)
+                known = await asyncio.to_thread(self.expenses_data.row_keys)
+                async for item in read_files(paths):
+                    name = os.path.basename(item.path)
+                    report = reports[item.path]
+                    status = alert = None
+                    if item.error is not None:
+                        report.errors.append(str(item.error))
+                    elif item.chunk is not None:
+                        try:
+                            added = await asyncio.to_thread(
+                                self.expenses_data.extend_unique,
+                                item.chunk.expenses,
+                                known,
+                            )
+                        except StoreFullError as err:
+                            await asyncio.to_thread(
+                                self.pop_alert, f'{name}: {err}'
+                            )
+                            break
+                        report.add(item.chunk, added)
+                        progress[item.path] = item.chunk.progress
+
+                    if item.done:
+                        finished += 1
+                        progress[item.path] = 1.0
+                        status = (
+                            f'{finished} de {len(paths)} arquivo(s) lido(s)'
+                        )
+                        alert = f'{name}: {report.summary()}'
+                    await asyncio.to_thread(
+                        self.show_import_progress,
+                        sum(progress.values()) / len(paths),
+                        status=status,
+                        alert=alert,
+                    )
+
+                fields['expenses'] = len(self.expenses_data) - first_new
+                await asyncio.to_thread(self.save_expenses, first_new)
+        finally:
+            self.import_lock.release()
+            await asyncio.to_thread(self.finish_import)
+
+    @batched
+    def show_import_progress(
+        self,
+        value: float,
+        status: Optional[str] = None,
+        alert: Optional[str] = None,
+    ):
+        self.import_progress.value = value
+        self.import_progress.visible = True
+        if status is not None:
+            self.import_status.value = status
+        if alert is not None:
+            self.pop_alert(alert)
+        self.refresh_expenses_view()
+        self.renderer.mark_dirty()
+
+    @batched
+    def finish_import(self):
+        self.import_progress.visible = False
+        self.import_status.value = ''
+        self.refresh_expenses_view()
+        self.renderer.mark_dirty()
+
+    def start_watcher(self):
+        if self.watcher is None:
+            return None
+        try:
+            self.watcher.start()
+        except OSError as err:
+            self.watcher = None
+            self.pop_alert(f'Não foi possível observar a pasta: {err}')
+
+    @traced('watch_import')
+    @batched
+    def handle_watched_files(self, paths: list[str]):
+        # Runs on the watcher's thread. Rows already in the portfolio are
+        # skipped, so a file that grew only adds its new lines.
+        from expenses_app.importer import ImportReport, iter_expense_chunks
+
+        report = ImportReport()
+        with self.import_lock:
+            first_new = len(self.expenses_data)
+            known = self.expenses_data.row_keys()
+            for path in paths:
+                name = os.path.basename(path)
+                self.import_status.value = f'Importando {name} da pasta...'
+                self.renderer.mark_dirty(now=True)
+                try:
+                    for chunk in iter_expense_chunks(path=path):
+                        added = self.expenses_data.extend_unique(
+                            chunk.expenses, known
+                        )
+                        report.add(chunk, added)
+                except (
+                    OSError,
+                    UnicodeDecodeError,
+                    ValueError,
+                    csv.Error,
+                ) as err:
+                    report.errors.append(f'{name}: {err}')
+                except StoreFullError as err:
+                    report.errors.append(f'{name}: {err}')
+                    break
+
+            added = len(self.expenses_data) - first_new
+            if added:
+                self.save_expenses(start=first_new)
+                self.refresh_expenses_view()
+
+        self.import_status.value = ''
+        self.renderer.mark_dirty()
+        if not added and not (report.skipped or report.errors):
+            return None
 
-        self.page.update()
+        self.pop_alert(f'Pasta observada: {report.summary()}')
 
-    def run_optimization(self):
-        start_date = self.__validate_input_date(self.input_opt_start_date)
-        if start_date is None:
-            self.pop_alert('Data no formato inválido')
+        # Only a portfolio that gained expenses is re-optimized, and only
+        # once the user has set up and run an optimization.
+        if added and self.latest_portfolio is not None:
+            self.call_optimization()
+
+    def handle_export(self, event: ft.FilePickerResultEvent):
+        if not event.path:
             return None
 
-        opt_params = self.get_optimization_parameters()
-        portfolio = self.get_portfolio(start_date)
+        self.import_status.value = 'Exportando...'
+        self.renderer.mark_dirty()
+
+        return io_loop.submit(
+            self.export_file(
+                event.path,
+                self.expenses_data.snapshot(),
+                self.latest_portfolio,
+            )
+        )
+
+    async def export_file(self, path: str, expenses: ExpenseStore, portfolio):
+        from expenses_app.exporter import ExportError, export_expenses
 
         try:
-            optimizer = Optimizer(
+            written = await asyncio.to_thread(
+                export_expenses,
+                path=path,
+                expenses=expenses,
+                portfolio=portfolio,
+            )
+            message = 'Arquivos exportados: ' + ', '.join(written)
+        except ExportError as err:
+            message = str(err)
+        except OSError as err:
+            message = f'Não foi possível exportar o arquivo: {err}'
+
+        await asyncio.to_thread(self.finish_export, message)
+
+    @batched
+    def finish_export(self, message: str):
+        self.import_status.value = ''
+        self.pop_alert(message)
+
+    @batched
+    def call_optimization(self):
+
+        if self.run_optimization() is not None:
+            self.refresh_optimization_status()
+
+    @traced('optimize')
+    def run_optimization(self):
+        with self.tracer.span('optimize.validation'):
+            values = self.read_forms(
+                self.parameters_form, self.budget_form, self.horizon_form
+            )
+            if values is None or not self.check_horizon(values):
+                return None
+            start_date = values['start_date']
+            opt_params = self.get_optimization_parameters(values)
+            parts = values['parts']
+            window = values['window']
+            overlap = values['overlap'] if window is not None else 0
+            target_choice = self.input_opt_target_choice.value
+
+        with self.tracer.span('optimize.get_portfolio'):
+            portfolio = self.get_portfolio(values)
+
+        key = portfolio_key(
+            self.expenses_data,
+            portfolio.budget,
+            opt_params,
+            start_date,
+            target_choice,
+        )
+        if window is not None:
+            key = f'{key}:window:{window}:{overlap}'
+        elif parts > 1:
+            key = f'{key}:{parts}:{self.input_opt_strategy.value}'
+        cached_spends = self.result_cache.get(key)
+        if cached_spends is not None:
+            self.latest_portfolio = apply_spends(portfolio, cached_spends)
+            self.latest_window = window
+            self.show_optimization_results(portfolio=portfolio)
+            self.pop_alert('Otimização finalizada! (resultado em cache)')
+            return None
+
+        with self.tracer.span('optimize.feasibility'):
+            if not self.check_feasibility(portfolio.budget, start_date):
+                return None
+
+        if window is not None or parts > 1:
+            job = OptimizationJob(
                 portfolio=portfolio,
                 parameters=opt_params,
                 start_date=start_date,
+                on_done=self.handle_inline_done,
+                key=key,
+                window=window,
+                target_choice=target_choice,
             )
+            if window is not None:
+                self.start_rolling(job, window, overlap)
+            else:
+                self.start_decomposed(job, parts)
+            return None
+
+        job = OptimizationJob(
+            portfolio=portfolio,
+            parameters=opt_params,
+            start_date=start_date,
+            on_done=self.handle_optimization_done,
+            key=key,
+            target_choice=target_choice,
+        )
 
-            optimizer.solve_optimization_problem()
+        try:
+            return self.optimization_worker.submit(job)
+        except PoolSaturatedError as err:
+            self.pop_alert(f'{err}. Tente novamente em instantes.')
+            return None
+
+    @batched
+    def check_feasibility(
+        self, budget: 'Budget', start_date: 'pendulum.DateTime'
+    ) -> bool:
+        from expenses_app.feasibility import check_feasibility
+
+        report = check_feasibility(
+            expenses=self.expenses_data,
+            budget=budget,
+            start_date=start_date,
+            target_choice=self.input_opt_target_choice.value,
+        )
+        period_name = PERIOD_NAMES[self.input_budget_recorrence_type.value]
+        for message in report.messages(period_name):
+            self.pop_alert(message)
+        return report.feasible
+
+    @batched
+    def handle_optimization_done(self, job: OptimizationJob):
+        from expenses_opt.exceptions import (
+            InfeasibleProblemException,
+            InvalidDataException,
+        )
+
+        self.tracer.record(
+            'optimize.solve', job.elapsed(), status=job.status.name
+        )
+        self.refresh_optimization_status()
+
+        if job.status == JobStatus.CANCELLED:
+            self.pop_alert('Otimização cancelada.')
+            return None
+
+        try:
+            if job.error is not None:
+                raise job.error
+            self.latest_portfolio = job.result
+            self.latest_window = job.window
+            self.result_cache.put(job.key, portfolio_spends(job.result))
+            self.record_run(job)
+            self.show_optimization_results(portfolio=job.result)
             self.pop_alert('Otimização finalizada!')
         except InfeasibleProblemException:
             self.pop_alert(
@@ -440,226 +1082,425 @@ class Aplication:
         except Exception as err:
             self.pop_alert(f'Um erro desconhecido aconteceu: {err}')
 
-        return portfolio
-
-    def get_budget(self, start_date: pendulum.Date):
-        price_map = {
-            'initial': {'value': None, 'input': self.input_budget_initial},
-            'recorrent': {'value': None, 'input': self.input_budget_recorrent},
-        }
+    def check_horizon(self, values: dict) -> bool:
+        # A window of None solves every period at once.
+        window = values['window']
+        if window is not None and values['overlap'] >= window:
+            self.pop_alert('A sobreposição deve ser menor que a janela')
+            return False
+        if window is not None and values['parts'] > 1:
+            self.pop_alert(
+                'Escolha entre dividir em partes e otimizar por janelas'
+            )
+            return False
+        return True
 
-        try:
-            self.__validate_numeric_fields(
-                price_map, 'Campo de preço inválido'
+    def current_window(self) -> Optional[int]:
+        # Periods shown when only the current window is asked for.
+        if not self.input_opt_current_window.value:
+            return None
+        return self.latest_window
+
+    def start_inline(self, job: OptimizationJob, solve, status: str):
+        # Decomposed and rolling solves manage their own processes, so they
+        # run on a thread of their own instead of the optimization worker.
+        self.opt_button.disabled = True
+        self.opt_progress.value = None
+        self.opt_progress.visible = True
+        self.opt_status.value = status
+        self.renderer.mark_dirty()
+
+        threading.Thread(target=job.run, args=(solve,), daemon=True).start()
+
+    def start_decomposed(self, job: OptimizationJob, parts: int):
+        from expenses_app.decompose import solve_decomposed
+
+        expenses = self.expenses_data.snapshot()
+        strategy = self.input_opt_strategy.value
+
+        def solve():
+            spends = solve_decomposed(
+                expenses=expenses,
+                budget=job.portfolio.budget,
+                parameters=job.parameters,
+                start_date=job.start_date,
+                parts=parts,
+                strategy=strategy,
+                target_choice=job.target_choice,
             )
-        except ValueError:
+            return apply_spends(job.portfolio, spends)
+
+        self.start_inline(job, solve, f'Otimizando em {parts} partes...')
+
+    def start_rolling(self, job: OptimizationJob, window: int, overlap: int):
+        from expenses_app.rolling import solve_rolling, window_count
+
+        expenses = self.expenses_data.snapshot()
+
+        def on_window(number: int, windows: int):
+            self.opt_progress.value = number / windows
+            self.opt_status.value = f'Janela {number} de {windows} resolvida'
+            self.renderer.mark_dirty(now=True)
+
+        def solve():
+            spends = solve_rolling(
+                expenses=expenses,
+                budget=job.portfolio.budget,
+                parameters=job.parameters,
+                start_date=job.start_date,
+                window=window,
+                overlap=overlap,
+                target_choice=job.target_choice,
+                on_window=on_window,
+            )
+            return apply_spends(job.portfolio, spends)
+
+        iterations = job.portfolio.budget.iterations
+        windows = window_count(iterations, window, overlap)
+        self.start_inline(job, solve, f'Otimizando em {windows} janelas...')
+
+    @batched
+    def handle_inline_done(self, job: OptimizationJob):
+        from expenses_app.decompose import solution_quality
+
+        self.opt_button.disabled = False
+        self.handle_optimization_done(job)
+        if job.status != JobStatus.DONE:
             return None
 
-        budget_last_recorrence_date = self.__validate_input_date(
-            self.input_budget_last_recorrence
+        quality = solution_quality(
+            portfolio_spends(job.result),
+            [expense.range.target for expense in job.result.expenses],
+        )
+        self.pop_alert(
+            f'Total gasto: R$ {quality.total_spend}, '
+            f'desvio do preço alvo: R$ {quality.deviation}'
         )
-        if budget_last_recorrence_date is None:
-            self.pop_alert(message='Data no formato inválido!')
-            return None
 
-        period = budget_last_recorrence_date - start_date
-        last_recorrence = period.days
+    def cancel_optimization(self):
+        self.optimization_worker.cancel_current()
 
-        values_map = {
-            'iterations': {
-                'value': None,
-                'input': self.input_budget_number_of_iterations,
-            }
-        }
+    def refresh_optimization_status(self):
+        job = self.optimization_worker.current_job
+        pending = self.optimization_worker.pending
+        running = job is not None and not job.finished
 
-        try:
-            self.__validate_numeric_fields(
-                values_map, 'Insira um valor inteiro', True
+        self.opt_progress.visible = running or pending > 0
+        self.cancel_button.visible = running
+
+        if running and job.status == JobStatus.PENDING:
+            self.opt_progress.value = None
+            self.opt_status.value = 'Aguardando um otimizador livre...'
+        elif running:
+            self.opt_progress.value = job.progress()
+            self.opt_status.value = (
+                f'Otimizando... {int(job.elapsed())}s decorridos'
             )
-            iterations = values_map['iterations']['value']
-        except ValueError:
-            return None
+        elif pending:
+            self.opt_progress.value = None
+            self.opt_status.value = 'Aguardando o otimizador...'
+        else:
+            self.opt_status.value = ''
 
-        recurrence_map = {'Mensal': 30, 'Quinzenal': 15, 'Semanal': 7}
-        recurrence_key = self.input_budget_recorrence_type.value
+        if pending:
+            self.opt_status.value += f' ({pending} na fila)'
 
-        return Budget(
-            initial=price_map['initial']['value'],
-            recorrent=price_map['recorrent']['value'],
-            recurrence=recurrence_map[recurrence_key],
-            last_recurrence=last_recorrence,
-            iterations=iterations,
-        )
+        self.renderer.mark_dirty()
 
-    def get_optimization_parameters(self):
+    @batched
+    def call_parameter_sweep(self):
+        from expenses_app.sweep import build_scenarios, parse_values
 
-        values_map = {
-            'exponent': {'value': None, 'input': self.input_opt_exponent},
-            'max_time': {'value': None, 'input': self.input_opt_max_time},
-        }
+        values = self.read_forms(self.parameters_form, self.budget_form)
+        if values is None:
+            return None
+        start_date = values['start_date']
+        opt_params = self.get_optimization_parameters(values)
+        budget = self.get_budget(values)
 
         try:
-            self.__validate_numeric_fields(
-                values_map, 'Insira um valor inteiro', True
-            )
+            exponents = parse_values(self.input_sweep_exponents.value)
+            weights = parse_values(self.input_sweep_weights.value)
         except ValueError:
+            self.pop_alert('Valores da varredura inválidos')
             return None
 
-        exponent = values_map['exponent']['value']
-        max_time = values_map['max_time']['value']
+        targets = [box.label for box in self.input_sweep_targets if box.value]
+        recurrences = [
+            box.label for box in self.input_sweep_recurrences if box.value
+        ]
+        scenarios = build_scenarios(exponents, weights, targets, recurrences)
+        if not scenarios:
+            self.pop_alert('Selecione um preço alvo e uma recorrência')
+            return None
 
-        values_map = {
-            'weight': {'value': None, 'input': self.input_opt_weight}
-        }
+        self.sweep_button.disabled = True
+        self.sweep_table.rows.clear()
+        self.sweep_status.value = f'0 de {len(scenarios)} cenários'
+        self.renderer.mark_dirty()
+
+        threading.Thread(
+            target=self.run_parameter_sweep,
+            args=(scenarios, budget, opt_params.max_time, start_date),
+            daemon=True,
+        ).start()
+
+    @batched
+    def run_parameter_sweep(self, scenarios, budget, max_time, start_date):
+        from expenses_app.sweep import run_sweep
+
+        done = []
+
+        def on_result(result: 'ScenarioResult'):
+            done.append(result)
+            self.sweep_status.value = (
+                f'{len(done)} de {len(scenarios)} cenários'
+            )
+            self.renderer.mark_dirty(now=True)
 
         try:
-            self.__validate_numeric_fields(
-                values_map, 'Insira um valor numérico válido', True
+            results = run_sweep(
+                scenarios=scenarios,
+                expenses=self.expenses_data.snapshot(),
+                budget=budget,
+                max_time=max_time,
+                start_date=start_date,
+                on_result=on_result,
+            )
+            self.show_sweep_results(results)
+        except Exception as err:
+            self.pop_alert(f'Um erro desconhecido aconteceu: {err}')
+        finally:
+            self.sweep_button.disabled = False
+            self.renderer.mark_dirty()
+
+    def show_sweep_results(self, results: list['ScenarioResult']):
+        for result in results:
+            scenario = result.scenario
+            if result.error is None:
+                total = f'R$ {result.total_spend}'
+                deviation = f'R$ {result.deviation}'
+            else:
+                total = deviation = 'Sem solução'
+
+            values = [
+                str(scenario.priority_exponent),
+                str(scenario.deviation_weight),
+                scenario.target_choice,
+                scenario.recurrence,
+                total,
+                deviation,
+            ]
+            self.sweep_table.rows.append(
+                ft.DataRow(
+                    cells=[ft.DataCell(ft.Text(value=v)) for v in values]
+                )
             )
-        except ValueError:
-            return None
 
-        weight = values_map['weight']['value']
+    def get_budget(self, values: dict) -> 'Budget':
+        return build_budget(
+            initial=values['initial'],
+            recorrent=values['recorrent'],
+            recurrence=self.input_budget_recorrence_type.value,
+            last_recurrence_date=values['last_recurrence'],
+            iterations=values['iterations'],
+            start_date=values['start_date'],
+        )
 
-        params = OptmizationParameters(
-            priority_exponent=exponent,
-            deviation_weight=weight,
-            max_time=max_time,
+    def get_optimization_parameters(self, values: dict):
+        return build_parameters(
+            priority_exponent=values['exponent'],
+            deviation_weight=values['weight'],
+            max_time=values['max_time'],
         )
 
-        return params
+    def get_portfolio(self, values: dict) -> 'Portfolio':
+        return self.expenses_data.to_portfolio(
+            budget=self.get_budget(values),
+            target_choice=self.input_opt_target_choice.value,
+        )
 
-    def get_portfolio(self, start_date: pendulum.Date) -> Portfolio:
-        budget = self.get_budget(start_date)
-        portfolio = Portfolio(
-            expenses=deepcopy(self.expenses_data), budget=budget
+    @traced('show_results')
+    def show_optimization_results(self, portfolio: 'Portfolio'):
+        self.results_table.show(
+            expenses=portfolio.expenses,
+            iterations=portfolio.budget.iterations,
+            period_name=PERIOD_NAMES[self.input_budget_recorrence_type.value],
+            budget=portfolio.budget,
+            period_limit=self.current_window(),
         )
+        self.renderer.mark_dirty()
 
-        return portfolio
+    @batched
+    def refresh_results(self):
+        if self.latest_portfolio is not None:
+            self.show_optimization_results(self.latest_portfolio)
 
-    def show_optimization_results(self, portfolio: Portfolio):
-        columns = [
-            ft.DataColumn(ft.Text(value='Nome', weight='bold')),
-            ft.DataColumn(ft.Text(value='Total gasto', weight='bold')),
-        ]
-        period_map = {
-            'Mensal': 'Mês',
-            'Quinzenal': 'Quinzena',
-            'Semanal': 'Semana',
-        }
-        period_name = period_map[self.input_budget_recorrence_type.value]
-        for it in range(portfolio.budget.iterations):
-            columns.append(
-                ft.DataColumn(
-                    ft.Text(value=f'{period_name} {it+1}', weight='bold'),
-                    numeric=True,
-                )
+    def load_saved_portfolio(self):
+        # Runs after the first frame; only the active portfolio is read.
+        try:
+            saved = self.database.load_expenses(
+                self.portfolio_name, max_bytes=self.expenses_data.max_bytes
+            )
+            self.expenses_data = saved
+            self.refresh_expenses_view()
+            self.refresh_history()
+        except (sqlite3.Error, StoreFullError) as err:
+            self.pop_alert(
+                f'Não foi possível carregar os gastos salvos: {err}'
             )
+        finally:
+            self.add_button.disabled = False
+            self.import_csv_button.disabled = False
+            self.start_watcher()
+            self.renderer.mark_dirty()
+
+    def save_expenses(self, start: int):
+        if self.database is None:
+            return None
+        self.database.save_expenses(
+            self.portfolio_name, self.expenses_data, start=start
+        )
 
-        self.results_table = ft.DataTable(
-            columns=columns,
-            border=ft.border.all(2, ft.colors.PURPLE_900),
-            border_radius=10,
-            vertical_lines=ft.border.BorderSide(1, ft.colors.PURPLE_900),
-            horizontal_lines=ft.border.BorderSide(1, ft.colors.GREEN_900),
+    def persist_rows(self, positions: list[int]):
+        if self.database is None:
+            return None
+        self.database.update_expenses(
+            self.portfolio_name, self.expenses_data, positions
         )
 
-        for expense in portfolio.expenses:
-            cells = [
-                ft.DataCell(ft.Text(value=expense.description)),
-                ft.DataCell(
-                    ft.Text(value=f'R$ {sum(expense.partial_spends)}')
-                ),
-            ]
-            for value in expense.partial_spends:
-                cells.append(ft.DataCell(ft.Text(value=f'R$ {value}')))
+    def record_run(self, job: OptimizationJob):
+        if self.database is None:
+            return None
+        self.database.record_run(
+            portfolio=self.portfolio_name,
+            solved=job.result,
+            parameters=job.parameters,
+            start_date=job.start_date,
+            target_choice=job.target_choice,
+            cache_key=job.key,
+        )
+        self.refresh_history()
 
-            new_row = ft.DataRow(cells=cells)
+    def refresh_history(self):
+        runs = self.database.runs(self.portfolio_name)
+        self.saved_runs = {str(run.id): run for run in runs}
+        self.input_history.options = [
+            ft.dropdown.Option(key=str(run.id), text=run.label) for run in runs
+        ]
+        self.input_history.visible = bool(runs)
+        self.renderer.mark_dirty()
 
-            self.results_table.rows.append(new_row)
+    @batched
+    def show_saved_run(self):
+        run = self.saved_runs.get(self.input_history.value)
+        if run is None:
+            return None
 
-        self.page.add(MyDivider())
-        self.page.add(
-            ft.Text(
-                value='Gastos sugeridos por período',
-                text_align=ft.TextAlign.CENTER,
-                weight='bold',
-                size=20,
-                color=ft.colors.DEEP_PURPLE_500,
-            )
+        recurrence = RECURRENCE_NAMES.get(run.recurrence, 'Mensal')
+        self.results_table.show(
+            expenses=self.database.run_results(run.id),
+            iterations=run.iterations,
+            period_name=PERIOD_NAMES[recurrence],
+        )
+        self.renderer.mark_dirty()
+
+    def section_title(self, value: str, size: int = 20) -> ft.Text:
+        return ft.Text(
+            value=value,
+            text_align=ft.TextAlign.CENTER,
+            weight='bold',
+            size=size,
+            color=ft.colors.DEEP_PURPLE_500,
         )
-        self.page.add(self.results_table)
+
+    def toggle_sweep_section(self):
+        # The sweep form is only built the first time it is opened.
+        if not self.sweep_section.controls:
+            self.build_sweep_controls()
+            self.sweep_section.controls = [
+                self.input_sweep_container1,
+                self.input_sweep_container2,
+                self.sweep_progress_container,
+                self.sweep_table,
+            ]
+        self.sweep_section.visible = not self.sweep_section.visible
+        self.renderer.mark_dirty()
 
     def run(self):
         self.page.title = 'Otimizador de Gastos'
         self.page.scroll = ft.ScrollMode.HIDDEN
 
-        self.page.add(self.title_text)
-        self.page.add(MyDivider())
-        self.page.add(
-            ft.Text(
-                value='Tabela de gastos',
-                text_align=ft.TextAlign.CENTER,
-                weight='bold',
-                size=20,
-                color=ft.colors.DEEP_PURPLE_500,
-            )
-        )
-
-        self.page.add(self.input_expense_name)
-        self.page.add(self.input_expense_range)
-        self.page.add(self.input_expense_params)
-        self.page.add(self.add_button)
-        self.page.add(self.import_csv_button)
-        self.page.add(self.export_csv_button)
-        self.page.add(self.expenses_table)
-
-        self.page.add(MyDivider())
-        self.page.add(
-            ft.Text(
-                value='Dados do orçamento',
-                text_align=ft.TextAlign.CENTER,
-                weight='bold',
-                size=20,
-                color=ft.colors.DEEP_PURPLE_500,
-            )
-        )
-        self.page.add(self.input_budget_values)
-        self.page.add(self.input_budget_params)
+        self.page.overlay.append(self.file_picker)
+        self.page.overlay.append(self.file_export)
+        self.page.overlay.append(self.metrics_panel)
+        self.page.dialog = self.notifier.dialog
+        self.page.on_close = lambda _: self.handle_close()
+        self.page.floating_action_button = self.metrics_button
 
-        self.page.add(MyDivider())
-        self.page.add(
-            ft.Text(
-                value='Parâmetros de otimização',
-                text_align=ft.TextAlign.CENTER,
-                weight='bold',
-                size=20,
-                color=ft.colors.DEEP_PURPLE_500,
-            )
-        )
-        self.page.add(self.input_opt_container1)
-        self.page.add(self.input_opt_container2)
-        self.page.add(self.opt_button)
+        self.expenses_table.refresh()
 
-        self.page.add(MyDivider())
+        # A single add sends the whole first frame in one message.
         self.page.add(
-            ft.Text(
-                value='Resultados',
-                text_align=ft.TextAlign.CENTER,
-                weight='bold',
-                size=25,
-                color=ft.colors.DEEP_PURPLE_500,
-            )
+            self.title_text,
+            MyDivider(),
+            self.section_title('Tabela de gastos'),
+            self.input_expense_name,
+            self.input_expense_range,
+            self.input_expense_params,
+            self.add_button,
+            self.edit_buttons,
+            self.import_csv_button,
+            self.export_csv_button,
+            self.import_progress_container,
+            self.expenses_view_controls,
+            self.expenses_table,
+            MyDivider(),
+            self.section_title('Dados do orçamento'),
+            self.input_budget_values,
+            self.input_budget_params,
+            MyDivider(),
+            self.section_title('Parâmetros de otimização'),
+            self.input_opt_container1,
+            self.input_opt_container2,
+            self.input_opt_container3,
+            self.input_opt_container4,
+            self.opt_button,
+            self.opt_progress_container,
+            MyDivider(),
+            self.sweep_toggle_button,
+            self.sweep_section,
+            MyDivider(),
+            self.section_title('Resultados', size=25),
+            self.input_history,
+            self.results_table,
         )
 
-        self.page.overlay.append(self.file_picker)
-        self.page.overlay.append(self.file_export)
-
-        self.page.update()
+        if self.database is not None:
+            # Adding rows before the saved ones are loaded would overwrite
+            # their positions in the database.
+            self.portfolio_name = self.database.active_portfolio()
+            self.add_button.disabled = True
+            self.import_csv_button.disabled = True
+            threading.Thread(
+                target=self.load_saved_portfolio, daemon=True
+            ).start()
+        else:
+            self.start_watcher()
+
+    def handle_close(self):
+        self.tracer.close()
+        self.optimization_worker.cancel_all()
+        if self.watcher is not None:
+            self.watcher.stop()
 
 
 def main(page: ft.Page):
-    app = Aplication()
+    configure_from_environment()
+    app = Aplication(
+        database=PortfolioDatabase.from_environment(),
+        watch_dir=os.environ.get(WATCH_DIR_ENV),
+    )
     app.main(page=page)
 
 
@@ -34,3 +34,60 @@ class MyText(ft.Text):
             color=DEEP_PURPLE,
             **kwargs
         )
+
+
+class MetricsPanel(ft.Container):
+    def __init__(self, **kwargs):
+        self.table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text(value='Ação', weight='bold')),
+                ft.DataColumn(ft.Text(value='N', weight='bold'), numeric=True),
+                ft.DataColumn(
+                    ft.Text(value='Última (ms)', weight='bold'), numeric=True
+                ),
+                ft.DataColumn(
+                    ft.Text(value='Média (ms)', weight='bold'), numeric=True
+                ),
+                ft.DataColumn(
+                    ft.Text(value='Máx. (ms)', weight='bold'), numeric=True
+                ),
+                ft.DataColumn(
+                    ft.Text(value='Controles', weight='bold'), numeric=True
+                ),
+            ],
+            heading_row_height=30,
+            data_row_height=28,
+        )
+        super().__init__(
+            content=ft.Column(
+                controls=[MyText(value='Desempenho', size=16), self.table],
+                scroll=ft.ScrollMode.AUTO,
+            ),
+            bgcolor=LIGHT_GREEN,
+            border=ft.border.all(2, MAIN_PURPLE),
+            border_radius=10,
+            padding=10,
+            visible=False,
+            **kwargs
+        )
+
+    def show_stats(self, stats: dict):
+        self.table.rows = [
+            ft.DataRow(
+                cells=[
+                    ft.DataCell(ft.Text(value=name)),
+                    ft.DataCell(ft.Text(value=str(span.count))),
+                    ft.DataCell(ft.Text(value=f'{span.last * 1000:.1f}')),
+                    ft.DataCell(ft.Text(value=f'{span.mean * 1000:.1f}')),
+                    ft.DataCell(ft.Text(value=f'{span.maximum * 1000:.1f}')),
+                    ft.DataCell(
+                        ft.Text(
+                            value=str(span.controls // span.count)
+                            if span.controls
+                            else '-'
+                        )
+                    ),
+                ]
+            )
+            for name, span in sorted(stats.items())
+        ]
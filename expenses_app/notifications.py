@@ -0,0 +1,42 @@
+import threading
+from collections import deque
+import flet as ft
+
+
+MAX_MESSAGES = 5
+
+
+# One dialog serves every alert of the session. Messages that arrive while
+# it is open are queued under the previous ones (oldest dropped first) and
+# repeats only bump a counter, so the control tree never grows.
+class Notifier:
+    def __init__(self, max_messages: int = MAX_MESSAGES) -> None:
+        self.messages: deque[list] = deque(maxlen=max_messages)
+        self.text = ft.Text(value='')
+        self.dialog = ft.AlertDialog(
+            title=self.text, on_dismiss=lambda _: self.dismiss()
+        )
+        self._lock = threading.Lock()
+
+    def notify(self, message: str):
+        with self._lock:
+            if not self.dialog.open:
+                self.messages.clear()
+
+            for entry in self.messages:
+                if entry[0] == message:
+                    entry[1] += 1
+                    break
+            else:
+                self.messages.append([message, 1])
+
+            self.text.value = '\n'.join(
+                text if count == 1 else f'{text} ({count}x)'
+                for text, count in self.messages
+            )
+            self.dialog.open = True
+
+    def dismiss(self):
+        with self._lock:
+            self.messages.clear()
+            self.dialog.open = False
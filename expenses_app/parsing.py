@@ -0,0 +1,96 @@
+import math
+import re
+from datetime import date
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable
+from expenses_app.store import date_from_ordinal
+
+if TYPE_CHECKING:
+    import pendulum
+
+
+# Parsers shared by the form fields and the csv importer. They only use the
+# patterns below and the standard library, so a large import never goes
+# through pendulum's format parser, and each distinct date string is turned
+# into a pendulum date once.
+
+# Thousands separated by dots and decimals by a comma: 1.234,56 or 2.000.
+# Anything else goes through float(), so 1234.56 still reads as usual.
+BRL_AMOUNT = re.compile(r'-?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d*)?')
+BR_DATE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})(?!\d)')
+
+PRIORITY_VALUES = {
+    '1': 1,
+    '2': 2,
+    '3': 3,
+    'alta': 1,
+    'média': 2,
+    'media': 2,
+    'baixa': 3,
+    'hight': 1,
+    'high': 1,
+    'medium': 2,
+    'low': 3,
+}
+
+
+def parse_amount(value: str) -> float:
+    value = value.strip()
+    if value.startswith('R$'):
+        value = value[2:].lstrip()
+
+    if ',' in value or '.' in value:
+        if BRL_AMOUNT.fullmatch(value) is not None:
+            value = value.replace('.', '').replace(',', '.')
+        elif ',' in value:
+            raise ValueError(f'valor inválido "{value}"')
+    try:
+        amount = float(value)
+    except ValueError:
+        raise ValueError(f'valor inválido "{value}"')
+    if not math.isfinite(amount):
+        raise ValueError(f'valor inválido "{value}"')
+    return round(amount, 2)
+
+
+def parse_integer(value: str) -> int:
+    # Decimal places are dropped, as the form always did.
+    return int(parse_amount(value))
+
+
+def at_least(minimum: int) -> Callable[[str], int]:
+    def parse(value: str) -> int:
+        number = parse_integer(value)
+        if number < minimum:
+            raise ValueError(f'deve ser pelo menos {minimum}')
+        return number
+
+    return parse
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> 'pendulum.DateTime':
+    # DD/MM/YYYY, or an ISO date with an optional time that is ignored.
+    value = value.strip()
+    match = BR_DATE.fullmatch(value)
+    if match is not None:
+        day, month, year = match.groups()
+    else:
+        match = ISO_DATE.match(value)
+        if match is None:
+            raise ValueError(f'data inválida "{value}", use DD/MM/AAAA')
+        year, month, day = match.groups()
+
+    try:
+        ordinal = date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        raise ValueError(f'data inexistente "{value}"')
+    return date_from_ordinal(ordinal)
+
+
+def parse_priority(value: str) -> int:
+    try:
+        return PRIORITY_VALUES[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f'prioridade desconhecida "{value}"')
@@ -0,0 +1,357 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from expenses_app.store import ExpenseStore
+
+
+DATABASE_ENV = 'EXPENSES_APP_DB'
+DEFAULT_DATABASE = os.path.join(
+    os.path.expanduser('~'), '.expenses_app', 'gastos.db'
+)
+DEFAULT_PORTFOLIO = 'Principal'
+
+# Same order as the arguments of ExpenseStore.append_row.
+EXPENSE_FIELDS = (
+    'description',
+    'minimum',
+    'maximum',
+    'target',
+    'priority',
+    'mandatory',
+    'due_date',
+)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS portfolios (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS expenses (
+    portfolio_id INTEGER NOT NULL REFERENCES portfolios (id),
+    position INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    minimum REAL NOT NULL,
+    maximum REAL NOT NULL,
+    target REAL NOT NULL,
+    priority INTEGER NOT NULL,
+    mandatory INTEGER NOT NULL,
+    due_date INTEGER NOT NULL,
+    PRIMARY KEY (portfolio_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS expenses_due_date
+    ON expenses (portfolio_id, due_date);
+CREATE TABLE IF NOT EXISTS budgets (
+    id INTEGER PRIMARY KEY,
+    initial REAL NOT NULL,
+    recorrent REAL NOT NULL,
+    recurrence INTEGER NOT NULL,
+    last_recurrence INTEGER NOT NULL,
+    iterations INTEGER NOT NULL,
+    UNIQUE (initial, recorrent, recurrence, last_recurrence, iterations)
+);
+CREATE TABLE IF NOT EXISTS parameter_sets (
+    id INTEGER PRIMARY KEY,
+    priority_exponent REAL NOT NULL,
+    deviation_weight REAL NOT NULL,
+    max_time INTEGER NOT NULL,
+    UNIQUE (priority_exponent, deviation_weight, max_time)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    portfolio_id INTEGER NOT NULL REFERENCES portfolios (id),
+    budget_id INTEGER NOT NULL REFERENCES budgets (id),
+    parameter_set_id INTEGER NOT NULL REFERENCES parameter_sets (id),
+    start_date TEXT NOT NULL,
+    target_choice TEXT NOT NULL,
+    cache_key TEXT,
+    total_spend REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_portfolio
+    ON runs (portfolio_id, created_at);
+CREATE INDEX IF NOT EXISTS runs_cache_key ON runs (cache_key);
+CREATE TABLE IF NOT EXISTS spends (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    position INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, position, period)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_expenses (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    position INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+) WITHOUT ROWID;
+'''
+
+
+@dataclass
+class RunRecord:
+    id: int
+    created_at: float
+    start_date: str
+    target_choice: str
+    recurrence: int
+    iterations: int
+    priority_exponent: float
+    deviation_weight: float
+    total_spend: float
+
+    @property
+    def label(self) -> str:
+        created = time.strftime(
+            '%d/%m/%Y %H:%M', time.localtime(self.created_at)
+        )
+        return (
+            f'{created} - {self.iterations} períodos, '
+            f'expoente {self.priority_exponent:g}, '
+            f'peso {self.deviation_weight:g}, R$ {self.total_spend}'
+        )
+
+
+# Result rows read back from the history, shaped like the solved expenses
+# the results table shows.
+@dataclass
+class SavedResult:
+    description: str
+    partial_spends: list[float]
+
+
+# One connection shared by the handler threads of the app; sqlite3 calls are
+# serialized by a lock. WAL lets other processes read while the app writes.
+class PortfolioDatabase:
+    def __init__(self, path: str = ':memory:') -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection as connection:
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute('PRAGMA foreign_keys = ON')
+            connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_environment(cls) -> 'PortfolioDatabase':
+        path = os.environ.get(DATABASE_ENV) or DEFAULT_DATABASE
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return cls(path)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def active_portfolio(self) -> str:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM settings WHERE key = 'active_portfolio'"
+            ).fetchone()
+        return row[0] if row else DEFAULT_PORTFOLIO
+
+    def set_active_portfolio(self, name: str):
+        with self._lock, self._connection as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO settings (key, value) '
+                "VALUES ('active_portfolio', ?)",
+                (name,),
+            )
+
+    def load_expenses(
+        self, portfolio: str, max_bytes: Optional[int] = None
+    ) -> ExpenseStore:
+        store = ExpenseStore(max_bytes=max_bytes)
+        with self._lock:
+            cursor = self._connection.execute(
+                f'SELECT {", ".join("e." + f for f in EXPENSE_FIELDS)} '
+                'FROM expenses e JOIN portfolios p ON p.id = e.portfolio_id '
+                'WHERE p.name = ? ORDER BY e.position',
+                (portfolio,),
+            )
+            for row in cursor:
+                store.append_row(*row)
+        return store
+
+    def save_expenses(
+        self, portfolio: str, expenses: ExpenseStore, start: int = 0
+    ):
+        # Appends expenses[start:]; earlier positions are already stored.
+        columns = [expenses.column(field) for field in EXPENSE_FIELDS]
+        rows = zip(range(start, len(expenses)), *(c[start:] for c in columns))
+
+        with self._lock, self._connection as connection:
+            portfolio_id = self.__portfolio_id(portfolio)
+            connection.execute(
+                'DELETE FROM expenses '
+                'WHERE portfolio_id = ? AND position >= ?',
+                (portfolio_id, start),
+            )
+            connection.executemany(
+                'INSERT INTO expenses (portfolio_id, position, '
+                f'{", ".join(EXPENSE_FIELDS)}) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((portfolio_id, *row) for row in rows),
+            )
+
+    def update_expenses(
+        self, portfolio: str, expenses: ExpenseStore, positions: list[int]
+    ):
+        # Rewrites the rows at the given positions after an edit or delete
+        # and drops the positions past the end of the store.
+        columns = [expenses.column(field) for field in EXPENSE_FIELDS]
+        rows = (
+            (position, *(column[position] for column in columns))
+            for position in positions
+            if position < len(expenses)
+        )
+
+        with self._lock, self._connection as connection:
+            portfolio_id = self.__portfolio_id(portfolio)
+            connection.execute(
+                'DELETE FROM expenses '
+                'WHERE portfolio_id = ? AND position >= ?',
+                (portfolio_id, len(expenses)),
+            )
+            connection.executemany(
+                'INSERT OR REPLACE INTO expenses (portfolio_id, position, '
+                f'{", ".join(EXPENSE_FIELDS)}) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((portfolio_id, *row) for row in rows),
+            )
+
+    def record_run(
+        self,
+        portfolio: str,
+        solved,
+        parameters,
+        start_date,
+        target_choice: str,
+        cache_key: Optional[str] = None,
+    ) -> int:
+        # The descriptions are saved with the spends: positions in the
+        # expenses table change on every edit or delete, so a run must not
+        # be read back through them.
+        budget = solved.budget
+        descriptions = [expense.description for expense in solved.expenses]
+        spends = [list(expense.partial_spends) for expense in solved.expenses]
+
+        with self._lock, self._connection as connection:
+            budget_id = self.__get_or_create(
+                'budgets',
+                initial=budget.initial,
+                recorrent=budget.recorrent,
+                recurrence=budget.recurrence,
+                last_recurrence=budget.last_recurrence,
+                iterations=budget.iterations,
+            )
+            parameter_set_id = self.__get_or_create(
+                'parameter_sets',
+                priority_exponent=parameters.priority_exponent,
+                deviation_weight=parameters.deviation_weight,
+                max_time=parameters.max_time,
+            )
+            run_id = connection.execute(
+                'INSERT INTO runs (portfolio_id, budget_id, parameter_set_id, '
+                'start_date, target_choice, cache_key, total_spend, '
+                'created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    self.__portfolio_id(portfolio),
+                    budget_id,
+                    parameter_set_id,
+                    start_date.isoformat(),
+                    target_choice,
+                    cache_key,
+                    round(sum(map(sum, spends)), 2),
+                    time.time(),
+                ),
+            ).lastrowid
+            connection.executemany(
+                'INSERT INTO run_expenses (run_id, position, description) '
+                'VALUES (?, ?, ?)',
+                (
+                    (run_id, position, description)
+                    for position, description in enumerate(descriptions)
+                ),
+            )
+            connection.executemany(
+                'INSERT INTO spends (run_id, position, period, value) '
+                'VALUES (?, ?, ?, ?)',
+                (
+                    (run_id, position, period, value)
+                    for position, values in enumerate(spends)
+                    for period, value in enumerate(values)
+                ),
+            )
+        return run_id
+
+    def runs(self, portfolio: str, limit: int = 20) -> list[RunRecord]:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT r.id, r.created_at, r.start_date, r.target_choice, '
+                'b.recurrence, b.iterations, p.priority_exponent, '
+                'p.deviation_weight, r.total_spend FROM runs r '
+                'JOIN portfolios f ON f.id = r.portfolio_id '
+                'JOIN budgets b ON b.id = r.budget_id '
+                'JOIN parameter_sets p ON p.id = r.parameter_set_id '
+                'WHERE f.name = ? ORDER BY r.created_at DESC LIMIT ?',
+                (portfolio, limit),
+            ).fetchall()
+        return [RunRecord(*row) for row in rows]
+
+    def run_results(self, run_id: int) -> list[SavedResult]:
+        results: list[SavedResult] = []
+        with self._lock:
+            cursor = self._connection.execute(
+                'SELECT s.position, e.description, s.value FROM spends s '
+                'LEFT JOIN run_expenses e ON e.run_id = s.run_id '
+                'AND e.position = s.position '
+                'WHERE s.run_id = ? ORDER BY s.position, s.period',
+                (run_id,),
+            )
+            for position, description, value in cursor:
+                if len(results) <= position:
+                    results.append(
+                        SavedResult(
+                            description=description or f'#{position + 1}',
+                            partial_spends=[],
+                        )
+                    )
+                results[position].partial_spends.append(value)
+        return results
+
+    def __portfolio_id(self, name: str) -> int:
+        connection = self._connection
+        row = connection.execute(
+            'SELECT id FROM portfolios WHERE name = ?', (name,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        return connection.execute(
+            'INSERT INTO portfolios (name, created_at) VALUES (?, ?)',
+            (name, time.time()),
+        ).lastrowid
+
+    def __get_or_create(self, table: str, **values) -> int:
+        names = ', '.join(values)
+        condition = ' AND '.join(f'{name} = ?' for name in values)
+        row = self._connection.execute(
+            f'SELECT id FROM {table} WHERE {condition}',
+            tuple(values.values()),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        placeholders = ', '.join('?' for _ in values)
+        return self._connection.execute(
+            f'INSERT INTO {table} ({names}) VALUES ({placeholders})',
+            tuple(values.values()),
+        ).lastrowid
+
@@ -0,0 +1,95 @@
+from typing import TYPE_CHECKING, Optional
+from expenses_app.store import ExpenseStore
+from expenses_app.worker import solve_portfolio
+
+# Flet-free steps shared by the GUI and the batch runner. The optimizer
+# package is imported on use so that importing the constants stays cheap.
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.portfolio import Budget, Portfolio
+    from expenses_opt.optimization.optimizer import OptmizationParameters
+
+
+RECURRENCE_DAYS = {'Mensal': 30, 'Quinzenal': 15, 'Semanal': 7}
+TARGET_CHOICES = ('Desejável', 'Mínimo', 'Máximo')
+
+
+def build_budget(
+    initial: float,
+    recorrent: float,
+    recurrence: str,
+    last_recurrence_date: 'pendulum.DateTime',
+    iterations: int,
+    start_date: 'pendulum.DateTime',
+) -> 'Budget':
+    from expenses_opt.models.portfolio import Budget
+
+    if recurrence not in RECURRENCE_DAYS:
+        raise ValueError(f'Recorrência desconhecida: {recurrence}')
+
+    return Budget(
+        initial=initial,
+        recorrent=recorrent,
+        recurrence=RECURRENCE_DAYS[recurrence],
+        last_recurrence=(last_recurrence_date - start_date).days,
+        iterations=iterations,
+    )
+
+
+def build_parameters(
+    priority_exponent: float, deviation_weight: float, max_time: int
+) -> 'OptmizationParameters':
+    from expenses_opt.optimization.optimizer import OptmizationParameters
+
+    return OptmizationParameters(
+        priority_exponent=priority_exponent,
+        deviation_weight=deviation_weight,
+        max_time=max_time,
+    )
+
+
+def optimize(
+    expenses: ExpenseStore,
+    budget: 'Budget',
+    parameters: 'OptmizationParameters',
+    start_date: 'pendulum.DateTime',
+    target_choice: str = 'Desejável',
+    parts: int = 1,
+    strategy: str = 'due_date',
+    window: Optional[int] = None,
+    overlap: int = 0,
+) -> 'Portfolio':
+    portfolio = expenses.to_portfolio(
+        budget=budget, target_choice=target_choice
+    )
+    if parts <= 1 and window is None:
+        return solve_portfolio(portfolio, parameters, start_date)
+
+    from expenses_app.cache import apply_spends
+
+    if window is not None:
+        from expenses_app.rolling import solve_rolling
+
+        spends = solve_rolling(
+            expenses=expenses,
+            budget=budget,
+            parameters=parameters,
+            start_date=start_date,
+            window=window,
+            overlap=overlap,
+            target_choice=target_choice,
+        )
+        return apply_spends(portfolio, spends)
+
+    from expenses_app.decompose import solve_decomposed
+
+    spends = solve_decomposed(
+        expenses=expenses,
+        budget=budget,
+        parameters=parameters,
+        start_date=start_date,
+        parts=parts,
+        strategy=strategy,
+        target_choice=target_choice,
+    )
+    return apply_spends(portfolio, spends)
@@ -0,0 +1,54 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable
+
+
+# Handlers mark the page dirty instead of updating it. Outside a batch the
+# update is sent at once; inside one (a whole user action) every change is
+# sent in a single update when the outermost batch ends. Batches are per
+# thread, so background progress is never held back by another handler.
+class RenderScheduler:
+    def __init__(self, flush: Callable[[], None]) -> None:
+        self._flush = flush
+        self._dirty = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def _depth(self) -> int:
+        return getattr(self._local, 'depth', 0)
+
+    def mark_dirty(self, now: bool = False):
+        # now=True is for progress reports inside long batched actions.
+        with self._lock:
+            self._dirty = True
+        if now or self._depth == 0:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        self._flush()
+
+    @contextmanager
+    def batch(self):
+        self._local.depth = self._depth + 1
+        try:
+            yield self
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self.flush()
+
+
+def batched(method):
+    # For methods of objects that keep their scheduler in self.renderer.
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.renderer.batch():
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,137 @@
+from math import ceil
+from typing import TYPE_CHECKING, Any, Callable, Optional
+import numpy as np
+from expenses_app.arrays import PortfolioArrays, budget_income
+from expenses_app.store import ExpenseStore, date_from_ordinal, priorities
+from expenses_app.worker import solve_portfolio
+
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.portfolio import Budget, Portfolio
+    from expenses_opt.optimization.optimizer import OptmizationParameters
+
+
+# Rolling horizon: instead of one model over every period, solve a window
+# of `window` periods with the expenses due inside it, keep the first
+# `window - overlap` periods of that solution and slide forward. Money not
+# spent in the kept periods is carried over as the next window's initial
+# budget, and what was already paid is taken off each expense's range.
+
+
+def window_count(iterations: int, window: int, overlap: int = 0) -> int:
+    step = max(window - overlap, 1)
+    if iterations <= window:
+        return 1
+    return ceil((iterations - window) / step) + 1
+
+
+def window_portfolio(
+    expenses: ExpenseStore,
+    arrays: PortfolioArrays,
+    selected: np.ndarray,
+    spent: np.ndarray,
+    budget: 'Budget',
+) -> 'Portfolio':
+    from expenses_opt.models.expense import Expense, ExpenseRange
+    from expenses_opt.models.portfolio import Portfolio
+
+    minimum = np.maximum(arrays.minimum[selected] - spent[selected], 0.0)
+    maximum = arrays.maximum[selected] - spent[selected]
+    target = np.clip(
+        arrays.target[selected] - spent[selected], minimum, maximum
+    )
+
+    descriptions = expenses.column('description')
+    due_dates = expenses.column('due_date')
+    by_value = priorities()
+    return Portfolio(
+        expenses=[
+            Expense(
+                description=descriptions[index],
+                due_date=date_from_ordinal(due_dates[index]),
+                priority=by_value[int(arrays.priority[index])],
+                mandatory=bool(arrays.mandatory[index]),
+                range=ExpenseRange(
+                    minimum=round(float(low), 2),
+                    maximum=round(float(high), 2),
+                    target=round(float(wanted), 2),
+                ),
+            )
+            for index, low, high, wanted in zip(
+                selected, minimum, maximum, target
+            )
+        ],
+        budget=budget,
+    )
+
+
+def solve_rolling(
+    expenses: ExpenseStore,
+    budget: 'Budget',
+    parameters: 'OptmizationParameters',
+    start_date: 'pendulum.DateTime',
+    window: int,
+    overlap: int = 0,
+    target_choice: str = 'Desejável',
+    on_window: Optional[Callable[[int, int], Any]] = None,
+) -> list[list[float]]:
+    # Returns the spends of every expense in the store's order.
+    from expenses_opt.models.portfolio import Budget
+
+    if window < 1 or not 0 <= overlap < window:
+        raise ValueError('A janela deve ser maior que a sobreposição')
+
+    arrays = PortfolioArrays.from_store(expenses, start_date, target_choice)
+    iterations = budget.iterations
+    due = arrays.due_period(budget.recurrence, iterations)
+    income = budget_income(budget)
+    spends = np.zeros((iterations, len(arrays)))
+    spent = np.zeros(len(arrays))
+    windows = window_count(iterations, window, overlap)
+
+    first = 0
+    for number in range(windows):
+        periods = min(window, iterations - first)
+        last = first + periods
+        # Only expenses due inside the window: one due in a period already
+        # kept cannot be paid any later.
+        selected = np.flatnonzero(
+            (due >= first) & (due < last) & (spent < arrays.maximum - 1e-9)
+        )
+        carried = float(income[:first].sum() - spends[:first].sum())
+        window_budget = Budget(
+            initial=round(carried + income[first], 2),
+            recorrent=budget.recorrent,
+            recurrence=budget.recurrence,
+            last_recurrence=max(
+                budget.last_recurrence - first * budget.recurrence, 0
+            ),
+            iterations=periods,
+        )
+
+        keep = periods if last >= iterations else periods - overlap
+        if len(selected):
+            portfolio = window_portfolio(
+                expenses, arrays, selected, spent, window_budget
+            )
+            solve_portfolio(
+                portfolio,
+                parameters,
+                start_date.add(days=first * budget.recurrence),
+            )
+            solved = np.array(
+                [
+                    expense.partial_spends[:keep]
+                    for expense in portfolio.expenses
+                ]
+            ).T
+            spends[first : first + keep, selected] = solved
+            spent[selected] += solved.sum(axis=0)
+
+        first += keep
+        if on_window is not None:
+            on_window(number + 1, windows)
+        if first >= iterations:
+            break
+
+    return spends.T.tolist()
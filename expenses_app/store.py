@@ -0,0 +1,493 @@
+import sys
+from array import array
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+# Creating an empty store must not load the optimizer stack, which is only
+# imported when expenses are materialized.
+if TYPE_CHECKING:
+    import pendulum
+    from expenses_opt.models.expense import Expense
+    from expenses_opt.models.portfolio import Budget, Portfolio
+
+
+NUMERIC_COLUMNS = {
+    'id': 'Q',
+    'minimum': 'd',
+    'maximum': 'd',
+    'target': 'd',
+    'priority': 'B',
+    'mandatory': 'B',
+    'due_date': 'l',
+}
+
+
+@lru_cache(maxsize=None)
+def priorities() -> dict:
+    from expenses_opt.constants import Priority
+
+    return {priority.value: priority for priority in Priority}
+
+
+@lru_cache(maxsize=None)
+def date_from_ordinal(ordinal: int) -> 'pendulum.DateTime':
+    import pendulum
+
+    # pendulum dates are immutable, so every expense due on the same day can
+    # share one object.
+    date = pendulum.Date.fromordinal(ordinal)
+    return pendulum.datetime(date.year, date.month, date.day)
+
+
+# Columns that identify an expense when deduplicating imports.
+KEY_COLUMNS = (
+    'description',
+    'minimum',
+    'maximum',
+    'target',
+    'priority',
+    'mandatory',
+    'due_date',
+)
+
+# Columns with a secondary index, used to filter and sort without scanning
+# the whole store.
+INDEXED_COLUMNS = ('due_date', 'priority', 'mandatory')
+
+# Bytes taken by the numeric columns of one expense.
+ROW_BYTES = sum(
+    array(typecode).itemsize for typecode in NUMERIC_COLUMNS.values()
+)
+
+
+class StoreFullError(MemoryError):
+    pass
+
+
+class ExpenseRecord(NamedTuple):
+    # One row of the store as plain values: no Expense object is built.
+    id: int
+    description: str
+    minimum: float
+    maximum: float
+    target: float
+    priority: int
+    mandatory: bool
+    due_date: int
+
+
+def expense_key(expense: 'Expense') -> tuple:
+    # Same values, in the same order, as ExpenseStore.row_keys.
+    return (
+        expense.description,
+        expense.range.minimum,
+        expense.range.maximum,
+        expense.range.target,
+        expense.priority.value,
+        int(bool(expense.mandatory)),
+        expense.due_date.toordinal(),
+    )
+
+
+def target_column(target_choice: str) -> str:
+    if target_choice == 'Mínimo':
+        return 'minimum'
+    if target_choice == 'Máximo':
+        return 'maximum'
+    return 'target'
+
+
+# Column-oriented expense storage. Snapshots share the columns and copy them
+# on the first write, so handing the data to a solver or an export job does
+# not duplicate it.
+class ExpenseStore:
+    def __init__(
+        self,
+        expenses: Iterable['Expense'] = (),
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self._columns: dict[str, Union[list, array]] = {
+            name: array(typecode) for name, typecode in NUMERIC_COLUMNS.items()
+        }
+        self._columns['description'] = list()
+        self._shared = False
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.next_id = 1
+        # Built on first use and kept up to date from then on: id ->
+        # position, and value -> positions for each indexed column.
+        self._positions: Optional[dict[int, int]] = None
+        self._indexes: Optional[dict[str, dict[int, set[int]]]] = None
+        self.extend(expenses)
+
+    def __len__(self) -> int:
+        return len(self._columns['description'])
+
+    def __iter__(self) -> Iterator['Expense']:
+        for index in range(len(self)):
+            yield self.expense_at(index)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            return [self.expense_at(i) for i in indices]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('expense index out of range')
+        return self.expense_at(index)
+
+    def column(self, name: str) -> Union[list, array]:
+        return self._columns[name]
+
+    def snapshot(self) -> 'ExpenseStore':
+        copy = ExpenseStore.__new__(ExpenseStore)
+        copy._columns = self._columns
+        copy._shared = self._shared = True
+        copy.max_bytes = self.max_bytes
+        copy.nbytes = self.nbytes
+        copy.next_id = self.next_id
+        copy._positions = None
+        copy._indexes = None
+        return copy
+
+    def append(self, expense: 'Expense'):
+        self.append_row(
+            description=expense.description,
+            minimum=expense.range.minimum,
+            maximum=expense.range.maximum,
+            target=expense.range.target,
+            priority=expense.priority.value,
+            mandatory=bool(expense.mandatory),
+            due_date=expense.due_date.toordinal(),
+        )
+
+    def append_row(
+        self,
+        description: str,
+        minimum: float,
+        maximum: float,
+        target: float,
+        priority: int,
+        mandatory: bool,
+        due_date: int,
+    ) -> int:
+        # Returns the id of the new expense. Approximate footprint: the
+        # numeric columns plus the description.
+        size = ROW_BYTES + sys.getsizeof(description)
+        if self.max_bytes is not None and self.nbytes + size > self.max_bytes:
+            raise StoreFullError(
+                f'Limite de {self.max_bytes / 2**20:g} MiB de gastos atingido'
+            )
+
+        self.__own_columns()
+        self.nbytes += size
+        expense_id = self.next_id
+        self.next_id += 1
+        columns = self._columns
+        columns['id'].append(expense_id)
+        columns['description'].append(description)
+        columns['minimum'].append(minimum)
+        columns['maximum'].append(maximum)
+        columns['target'].append(target)
+        columns['priority'].append(priority)
+        columns['mandatory'].append(mandatory)
+        columns['due_date'].append(due_date)
+
+        position = len(self) - 1
+        if self._positions is not None:
+            self._positions[expense_id] = position
+        self.__index(position)
+        return expense_id
+
+    def extend(self, expenses: Iterable['Expense']):
+        for expense in expenses:
+            self.append(expense)
+
+    def extend_unique(
+        self, expenses: Iterable['Expense'], known: Optional[set] = None
+    ) -> int:
+        # Appends the expenses whose row key is not in known (by default,
+        # the keys already in the store) and returns how many were added.
+        if known is None:
+            known = self.row_keys()
+        added = 0
+        for expense in expenses:
+            key = expense_key(expense)
+            if key not in known:
+                known.add(key)
+                self.append(expense)
+                added += 1
+        return added
+
+    def position_of(self, expense_id: int) -> int:
+        if self._positions is None:
+            self._positions = {
+                expense_id: position
+                for position, expense_id in enumerate(self._columns['id'])
+            }
+        try:
+            return self._positions[expense_id]
+        except KeyError:
+            raise KeyError(f'Gasto {expense_id} não encontrado')
+
+    def record(self, position: int) -> ExpenseRecord:
+        columns = self._columns
+        return ExpenseRecord(
+            id=columns['id'][position],
+            description=columns['description'][position],
+            minimum=columns['minimum'][position],
+            maximum=columns['maximum'][position],
+            target=columns['target'][position],
+            priority=columns['priority'][position],
+            mandatory=bool(columns['mandatory'][position]),
+            due_date=columns['due_date'][position],
+        )
+
+    def get(self, expense_id: int) -> ExpenseRecord:
+        return self.record(self.position_of(expense_id))
+
+    def update(self, expense_id: int, **values) -> int:
+        # Changes some columns of one expense in place and returns its
+        # position.
+        position = self.position_of(expense_id)
+        unknown = set(values) - set(KEY_COLUMNS)
+        if unknown:
+            raise ValueError(f'Colunas desconhecidas: {sorted(unknown)}')
+
+        self.__own_columns()
+        self.__unindex(position)
+        columns = self._columns
+        if 'description' in values:
+            self.nbytes += sys.getsizeof(values['description'])
+            self.nbytes -= sys.getsizeof(columns['description'][position])
+        for name, value in values.items():
+            columns[name][position] = value
+        self.__index(position)
+        return position
+
+    def delete(self, expense_id: int) -> tuple[int, bool]:
+        # The last expense takes the place of the deleted one, so nothing
+        # is shifted. Returns that position and whether a row moved there.
+        position = self.position_of(expense_id)
+        last = len(self) - 1
+
+        self.__own_columns()
+        self.__unindex(position)
+        if position != last:
+            self.__unindex(last)
+        columns = self._columns
+        self.nbytes -= ROW_BYTES + sys.getsizeof(
+            columns['description'][position]
+        )
+        for column in columns.values():
+            column[position] = column[last]
+            del column[last]
+
+        del self._positions[expense_id]
+        moved = position != last
+        if moved:
+            self._positions[columns['id'][position]] = position
+            self.__index(position)
+        return position, moved
+
+    def where(
+        self,
+        priority: Optional[int] = None,
+        mandatory: Optional[bool] = None,
+        due_before: Optional[int] = None,
+    ) -> Optional[set[int]]:
+        # Positions matching every given filter; None when none is given.
+        indexes = self.__indexes()
+        matches = []
+        if priority is not None:
+            matches.append(indexes['priority'].get(priority, set()))
+        if mandatory is not None:
+            matches.append(indexes['mandatory'].get(int(mandatory), set()))
+        if due_before is not None:
+            due = set()
+            for due_date, positions in indexes['due_date'].items():
+                if due_date < due_before:
+                    due |= positions
+            matches.append(due)
+        if not matches:
+            return None
+
+        matches.sort(key=len)
+        return set(matches[0]).intersection(*matches[1:])
+
+    def query(
+        self,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        **filters,
+    ) -> list[int]:
+        # Positions of the matching expenses, sorted by an indexed column
+        # (ties keep store order) or in store order.
+        selected = self.where(**filters)
+        if order_by is None:
+            positions = (
+                range(len(self)) if selected is None else sorted(selected)
+            )
+            return list(reversed(positions) if descending else positions)
+
+        groups = self.__indexes()[order_by]
+        positions = []
+        for value in sorted(groups, reverse=descending):
+            group = groups[value]
+            if selected is not None:
+                group = group & selected
+            positions.extend(sorted(group))
+        return positions
+
+    def take(self, indices: Iterable[int]) -> 'ExpenseStore':
+        # New store with the given rows, in the given order.
+        indices = list(indices)
+        subset = ExpenseStore(max_bytes=self.max_bytes)
+        for name, column in self._columns.items():
+            values = [column[index] for index in indices]
+            if isinstance(column, array):
+                subset._columns[name] = array(column.typecode, values)
+            else:
+                subset._columns[name] = values
+        subset.nbytes = ROW_BYTES * len(indices) + sum(
+            sys.getsizeof(description)
+            for description in subset._columns['description']
+        )
+        subset.next_id = self.next_id
+        return subset
+
+    def clear(self):
+        self.__own_columns()
+        for column in self._columns.values():
+            del column[:]
+        self.nbytes = 0
+        self._positions = None
+        self._indexes = None
+
+    def row_keys(self) -> set[tuple]:
+        return set(zip(*(self._columns[name] for name in KEY_COLUMNS)))
+
+    def expense_at(self, index: int, target_choice: str = 'Desejável'):
+        from expenses_opt.models.expense import Expense, ExpenseRange
+
+        columns = self._columns
+        return Expense(
+            description=columns['description'][index],
+            due_date=date_from_ordinal(columns['due_date'][index]),
+            priority=priorities()[columns['priority'][index]],
+            mandatory=bool(columns['mandatory'][index]),
+            range=ExpenseRange(
+                minimum=columns['minimum'][index],
+                maximum=columns['maximum'][index],
+                target=columns[target_column(target_choice)][index],
+            ),
+        )
+
+    def to_expenses(
+        self, target_choice: str = 'Desejável'
+    ) -> list['Expense']:
+        from expenses_opt.models.expense import Expense, ExpenseRange
+
+        by_value = priorities()
+        columns = self._columns
+        rows = zip(
+            columns['description'],
+            columns['due_date'],
+            columns['priority'],
+            columns['mandatory'],
+            columns['minimum'],
+            columns['maximum'],
+            columns[target_column(target_choice)],
+        )
+        return [
+            Expense(
+                description=description,
+                due_date=date_from_ordinal(due_date),
+                priority=by_value[priority],
+                mandatory=bool(mandatory),
+                range=ExpenseRange(
+                    minimum=minimum, maximum=maximum, target=target
+                ),
+            )
+            for (
+                description,
+                due_date,
+                priority,
+                mandatory,
+                minimum,
+                maximum,
+                target,
+            ) in rows
+        ]
+
+    def to_portfolio(
+        self, budget: 'Budget', target_choice: str = 'Desejável'
+    ) -> 'Portfolio':
+        from expenses_opt.models.portfolio import Portfolio
+
+        return Portfolio(
+            expenses=self.to_expenses(target_choice), budget=budget
+        )
+
+    def __indexes(self) -> dict[str, dict[int, set[int]]]:
+        if self._indexes is None:
+            self._indexes = {name: dict() for name in INDEXED_COLUMNS}
+            for position in range(len(self)):
+                self.__index(position)
+        return self._indexes
+
+    def __index(self, position: int):
+        if self._indexes is None:
+            return None
+        for name, groups in self._indexes.items():
+            value = self._columns[name][position]
+            groups.setdefault(value, set()).add(position)
+
+    def __unindex(self, position: int):
+        if self._indexes is None:
+            return None
+        for name, groups in self._indexes.items():
+            value = self._columns[name][position]
+            group = groups[value]
+            group.discard(position)
+            if not group:
+                del groups[value]
+
+    def __own_columns(self):
+        if self._shared:
+            self._columns = {
+                name: column[:] for name, column in self._columns.items()
+            }
+            self._shared = False
+
+
+# Rows of a store as ExpenseRecords, in the order given by positions (every
+# row, in store order, by default). Tables page through it without building
+# Expense objects.
+class ExpenseView:
+    def __init__(
+        self, store: ExpenseStore, positions: Optional[list[int]] = None
+    ) -> None:
+        self.store = store
+        self.positions = positions
+
+    def __len__(self) -> int:
+        if self.positions is None:
+            return len(self.store)
+        return len(self.positions)
+
+    def __getitem__(self, index: Union[int, slice]):
+        positions = self.positions
+        if positions is None:
+            positions = range(len(self.store))
+        if isinstance(index, slice):
+            return [self.store.record(p) for p in positions[index]]
+        return self.store.record(positions[index])
@@ -0,0 +1,152 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from expenses_opt.models.portfolio import Budget
+from expenses_app.pipeline import RECURRENCE_DAYS, build_parameters
+from expenses_app.store import ExpenseStore
+from expenses_app.worker import MP_CONTEXT, solve_portfolio
+
+
+@dataclass(frozen=True)
+class Scenario:
+    priority_exponent: float
+    deviation_weight: float
+    target_choice: str = 'Desejável'
+    recurrence: str = 'Mensal'
+
+
+@dataclass
+class ScenarioResult:
+    scenario: Scenario
+    total_spend: Optional[float] = None
+    deviation: Optional[float] = None
+    error: Optional[str] = None
+
+
+def parse_values(text: str) -> list[float]:
+    # Accepts '2; 2,5; 3' or an inclusive range 'start:stop:step'.
+    values = []
+    for part in text.split(';'):
+        part = part.strip().replace(',', '.')
+        if not part:
+            continue
+        if ':' in part:
+            bounds = [float(bound) for bound in part.split(':')]
+            if len(bounds) > 3:
+                raise ValueError('Use início:fim:passo')
+            start, stop, step = bounds if len(bounds) == 3 else bounds + [1.0]
+            if step <= 0:
+                raise ValueError('O passo deve ser positivo')
+            count = int((stop - start) / step + 1e-9) + 1
+            values.extend(
+                round(start + index * step, 6) for index in range(count)
+            )
+        else:
+            values.append(float(part))
+
+    if not values:
+        raise ValueError('Informe ao menos um valor')
+
+    return values
+
+
+def budget_with_recurrence(budget: Budget, recurrence: str) -> Budget:
+    return Budget(
+        initial=budget.initial,
+        recorrent=budget.recorrent,
+        recurrence=RECURRENCE_DAYS[recurrence],
+        last_recurrence=budget.last_recurrence,
+        iterations=budget.iterations,
+    )
+
+
+def build_scenarios(
+    exponents: list[float],
+    weights: list[float],
+    target_choices: list[str],
+    recurrences: list[str],
+) -> list[Scenario]:
+    return [
+        Scenario(*values)
+        for values in itertools.product(
+            exponents, weights, target_choices, recurrences
+        )
+    ]
+
+
+def solve_scenario(
+    scenario: Scenario,
+    expenses: ExpenseStore,
+    budget: Budget,
+    max_time: int,
+    start_date,
+) -> ScenarioResult:
+    portfolio = expenses.to_portfolio(
+        budget=budget_with_recurrence(budget, scenario.recurrence),
+        target_choice=scenario.target_choice,
+    )
+    parameters = build_parameters(
+        priority_exponent=scenario.priority_exponent,
+        deviation_weight=scenario.deviation_weight,
+        max_time=max_time,
+    )
+
+    try:
+        solve_portfolio(portfolio, parameters, start_date)
+    except Exception as err:
+        return ScenarioResult(scenario=scenario, error=str(err) or repr(err))
+
+    # The deviation is always measured from the desired price, whatever
+    # target the scenario optimized for, so rows can be compared.
+    total_spend = 0.0
+    deviation = 0.0
+    for expense, desired in zip(portfolio.expenses, expenses.column('target')):
+        spent = sum(expense.partial_spends)
+        total_spend += spent
+        deviation += abs(spent - desired)
+
+    return ScenarioResult(
+        scenario=scenario,
+        total_spend=round(total_spend, 2),
+        deviation=round(deviation, 2),
+    )
+
+
+def run_sweep(
+    scenarios: list[Scenario],
+    expenses: ExpenseStore,
+    budget: Budget,
+    max_time: int,
+    start_date,
+    max_workers: Optional[int] = None,
+    on_result: Optional[Callable[[ScenarioResult], Any]] = None,
+) -> list[ScenarioResult]:
+    max_workers = min(max_workers or os.cpu_count() or 1, len(scenarios))
+    results = []
+
+    with ProcessPoolExecutor(
+        max_workers=max(max_workers, 1), mp_context=MP_CONTEXT
+    ) as executor:
+        futures = [
+            executor.submit(
+                solve_scenario,
+                scenario,
+                expenses,
+                budget,
+                max_time,
+                start_date,
+            )
+            for scenario in scenarios
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    order = {scenario: index for index, scenario in enumerate(scenarios)}
+    results.sort(key=lambda result: order[result.scenario])
+
+    return results
@@ -0,0 +1,250 @@
+from math import ceil
+from typing import Any, Callable, Optional, Sequence
+import flet as ft
+from expenses_app.constants import MAIN_GREEN, MAIN_PURPLE
+
+
+PAGE_SIZES = (25, 50, 100, 200)
+
+
+# Only the rows of the visible page become controls. They are reused
+# between pages, so navigating only rewrites cell values and each update
+# sends a diff instead of a new control tree.
+class PaginatedTable(ft.Column):
+    def __init__(
+        self,
+        columns: list[ft.DataColumn],
+        source: Sequence,
+        row_builder: Callable[[Any], list[str]],
+        page_size: int = PAGE_SIZES[0],
+        request_update: Optional[Callable[[], None]] = None,
+        on_select: Optional[Callable[[Any], None]] = None,
+        **table_kwargs,
+    ):
+        self.source = source
+        self.request_update = request_update
+        self.row_builder = row_builder
+        self.page_size = page_size
+        self.page_index = 0
+        # Clicking a row hands its item to on_select; the row showing the
+        # selected item is highlighted.
+        self.on_select = on_select
+        self.selected: Any = None
+        self.page_items: list = []
+
+        self.table = ft.DataTable(columns=columns, **table_kwargs)
+
+        self.first_button = ft.IconButton(
+            ft.icons.FIRST_PAGE, on_click=lambda _: self.go_to(0)
+        )
+        self.previous_button = ft.IconButton(
+            ft.icons.CHEVRON_LEFT,
+            on_click=lambda _: self.go_to(self.page_index - 1),
+        )
+        self.next_button = ft.IconButton(
+            ft.icons.CHEVRON_RIGHT,
+            on_click=lambda _: self.go_to(self.page_index + 1),
+        )
+        self.last_button = ft.IconButton(
+            ft.icons.LAST_PAGE,
+            on_click=lambda _: self.go_to(self.page_count - 1),
+        )
+        self.input_page = ft.TextField(
+            value='1',
+            width=70,
+            text_align=ft.TextAlign.RIGHT,
+            keyboard_type=ft.KeyboardType.NUMBER,
+            border_color=MAIN_GREEN,
+            on_submit=lambda _: self.jump_to_input_page(),
+        )
+        self.page_count_text = ft.Text(value='de 1', color=MAIN_PURPLE)
+        self.input_page_size = ft.Dropdown(
+            label='Linhas por página',
+            width=160,
+            options=[ft.dropdown.Option(str(size)) for size in PAGE_SIZES],
+            value=str(page_size),
+            border_color=MAIN_GREEN,
+            on_change=lambda _: self.change_page_size(),
+        )
+        self.total_text = ft.Text(value='', color=MAIN_PURPLE)
+
+        super().__init__(
+            controls=[
+                self.table,
+                ft.Row(
+                    controls=[
+                        self.first_button,
+                        self.previous_button,
+                        self.input_page,
+                        self.page_count_text,
+                        self.next_button,
+                        self.last_button,
+                        self.input_page_size,
+                        self.total_text,
+                    ]
+                ),
+            ]
+        )
+
+    @property
+    def page_count(self) -> int:
+        return max(1, ceil(len(self.source) / self.page_size))
+
+    def go_to(self, page_index: int):
+        self.page_index = min(max(page_index, 0), self.page_count - 1)
+        self.refresh()
+        if self.request_update is not None:
+            self.request_update()
+        else:
+            self.update()
+
+    def go_to_last(self):
+        self.go_to(self.page_count - 1)
+
+    def jump_to_input_page(self):
+        try:
+            page_index = int(self.input_page.value) - 1
+        except ValueError:
+            page_index = self.page_index
+        self.go_to(page_index)
+
+    def change_page_size(self):
+        first_visible = self.page_index * self.page_size
+        self.page_size = int(self.input_page_size.value)
+        self.go_to(first_visible // self.page_size)
+
+    def refresh(self):
+        self.page_index = min(self.page_index, self.page_count - 1)
+        start = self.page_index * self.page_size
+        visible = self.source[start : start + self.page_size]
+        self.page_items = visible
+
+        rows = self.table.rows
+        for position, item in enumerate(visible):
+            values = self.row_builder(item)
+            if position < len(rows):
+                self.__update_row(rows[position], values)
+            else:
+                rows.append(self.__new_row(position, values))
+            if self.on_select is not None:
+                rows[position].selected = item == self.selected
+        del rows[len(visible) :]
+
+        self.input_page.value = str(self.page_index + 1)
+        self.page_count_text.value = f'de {self.page_count}'
+        self.total_text.value = f'{len(self.source)} itens'
+        self.first_button.disabled = self.page_index == 0
+        self.previous_button.disabled = self.page_index == 0
+        self.next_button.disabled = self.page_index >= self.page_count - 1
+        self.last_button.disabled = self.page_index >= self.page_count - 1
+
+    def select(self, position: int):
+        if position >= len(self.page_items):
+            return None
+        item = self.page_items[position]
+        self.selected = None if item == self.selected else item
+        self.on_select(self.selected)
+
+    def __new_row(self, position: int, values: list[str]) -> ft.DataRow:
+        row = ft.DataRow(
+            cells=[ft.DataCell(ft.Text(value=value)) for value in values]
+        )
+        if self.on_select is not None:
+            row.on_select_changed = lambda _: self.select(position)
+        return row
+
+    def __update_row(self, row: ft.DataRow, values: list[str]):
+        for cell, value in zip(row.cells, values):
+            text: ft.Text = cell.content
+            if text.value != value:
+                text.value = value
+
+
+# Results of successive optimizations share one table: the cells are
+# rewritten in place and period columns are only added or removed when the
+# number of periods changes.
+class ResultsTable(PaginatedTable):
+    def __init__(self, **table_kwargs):
+        super().__init__(
+            columns=[
+                ft.DataColumn(ft.Text(value='Nome', weight='bold')),
+                ft.DataColumn(ft.Text(value='Total gasto', weight='bold')),
+            ],
+            source=[],
+            row_builder=self.result_to_row,
+            **table_kwargs,
+        )
+        self.summary_text = ft.Text(value='', color=MAIN_PURPLE)
+        self.controls.insert(0, self.summary_text)
+        self.period_limit: Optional[int] = None
+        self.visible = False
+
+    def result_to_row(self, expense) -> list[str]:
+        spends = expense.partial_spends[: self.period_limit]
+        return [
+            expense.description,
+            f'R$ {sum(expense.partial_spends)}',
+            *(f'R$ {value}' for value in spends),
+        ]
+
+    def set_periods(self, iterations: int, period_name: str):
+        columns = self.table.columns
+        if len(columns) - 2 != iterations:
+            del columns[2:]
+            columns.extend(
+                ft.DataColumn(ft.Text(weight='bold'), numeric=True)
+                for _ in range(iterations)
+            )
+            # Rows with the old number of cells cannot be reused.
+            self.table.rows.clear()
+
+        for position, column in enumerate(columns[2:], start=1):
+            column.label.value = f'{period_name} {position}'
+
+    def show(
+        self,
+        expenses: Sequence,
+        iterations: int,
+        period_name: str,
+        budget=None,
+        period_limit: Optional[int] = None,
+    ):
+        # period_limit shows only the first periods, e.g. the current
+        # window of a rolling-horizon solve.
+        self.period_limit = period_limit
+        self.set_periods(
+            min(iterations, period_limit or iterations), period_name
+        )
+        self.source = expenses
+        self.summary_text.value = self.summarize(
+            expenses, period_name, budget, period_limit
+        )
+        self.visible = True
+        self.refresh()
+
+    @staticmethod
+    def summarize(
+        expenses, period_name, budget=None, period_limit=None
+    ) -> str:
+        from expenses_app.arrays import spends_matrix, utilization
+
+        if not expenses:
+            return ''
+        totals = spends_matrix(
+            [expense.partial_spends for expense in expenses]
+        ).sum(axis=1)
+        parts = [
+            f'{period_name} {period}: R$ {total:.2f}'
+            for period, total in enumerate(totals, start=1)
+        ]
+        if budget is None:
+            return 'Total por período: ' + ', '.join(parts[:period_limit])
+
+        parts = [
+            f'{part} ({share:.0%})'
+            for part, share in zip(parts, utilization(totals, budget))
+        ]
+        return (
+            'Total por período (uso do orçamento acumulado): '
+            + ', '.join(parts[:period_limit])
+        )
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+WATCH_DIR_ENV = 'EXPENSES_APP_WATCH_DIR'
+# A file is only read once it has gone this long without changing, so a
+# copy still in progress is not imported half-way.
+DEBOUNCE_SECONDS = 2.0
+POLL_INTERVAL = 1.0
+
+logger = logging.getLogger('expenses_app.watcher')
+
+
+def is_csv(path: str) -> bool:
+    return path.lower().endswith('.csv')
+
+
+def file_signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def start_observer(directory: str, touch: Callable[[str], Any]):
+    # watchdog is optional: without it (or when the platform backend cannot
+    # start) the watcher falls back to scanning the directory.
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            for path in (event.src_path, getattr(event, 'dest_path', '')):
+                if path and is_csv(path):
+                    touch(path)
+
+    observer = Observer()
+    observer.daemon = True
+    try:
+        observer.schedule(Handler(), directory, recursive=False)
+        observer.start()
+    except OSError:
+        return None
+    return observer
+
+
+# Watches a directory for csv files that are new or changed since they were
+# last handed to on_files. Files already in the directory when the watcher
+# starts count as new; deduplicating their rows is up to the callback.
+class FolderWatcher:
+    def __init__(
+        self,
+        directory: str,
+        on_files: Callable[[list[str]], Any],
+        debounce: float = DEBOUNCE_SECONDS,
+        poll_interval: float = POLL_INTERVAL,
+    ) -> None:
+        self.directory = os.path.abspath(directory)
+        self.on_files = on_files
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.observer = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # path -> when it last changed, for files waiting out the debounce.
+        self._pending: dict[str, float] = dict()
+        # path -> signature seen by the last scan / last handed over.
+        self._scanned: dict[str, tuple[int, int]] = dict()
+        self._delivered: dict[str, tuple[int, int]] = dict()
+
+    @property
+    def polling(self) -> bool:
+        return self.observer is None
+
+    def start(self):
+        if self._thread is not None:
+            return None
+        if not os.path.isdir(self.directory):
+            raise NotADirectoryError(self.directory)
+
+        self.observer = start_observer(self.directory, self.touch)
+        self.scan()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.observer is not None:
+            self.observer.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval * 2)
+
+    def touch(self, path: str):
+        with self._lock:
+            self._pending[os.path.abspath(path)] = time.monotonic()
+
+    def scan(self):
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return None
+        for entry in entries:
+            if not entry.is_file() or not is_csv(entry.name):
+                continue
+            signature = file_signature(entry.path)
+            if signature is not None and (
+                self._scanned.get(entry.path) != signature
+            ):
+                self._scanned[entry.path] = signature
+                self.touch(entry.path)
+
+    def ready_files(self) -> list[str]:
+        # Files that stopped changing and differ from what was handed over.
+        now = time.monotonic()
+        with self._lock:
+            settled = [
+                path
+                for path, changed in self._pending.items()
+                if now - changed >= self.debounce
+            ]
+            for path in settled:
+                del self._pending[path]
+
+        ready = []
+        for path in sorted(settled):
+            signature = file_signature(path)
+            if signature is None:
+                self._delivered.pop(path, None)
+            elif self._delivered.get(path) != signature:
+                self._delivered[path] = signature
+                ready.append(path)
+        return ready
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            if self.polling:
+                self.scan()
+            files = self.ready_files()
+            if not files:
+                continue
+            # A failing callback must not end the thread, or the folder
+            # would silently stop being watched.
+            try:
+                self.on_files(files)
+            except Exception:
+                logger.exception('Falha ao importar %s', ', '.join(files))
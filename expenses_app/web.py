@@ -0,0 +1,83 @@
+import argparse
+import os
+from typing import Optional
+import flet as ft
+from expenses_app.instrumentation import configure_from_environment
+from expenses_app.main import Aplication
+from expenses_app.worker import SolverPool
+
+
+# Web deployment: python -m expenses_app.web --port 8550
+#
+# Every browser session gets its own Aplication, but they all share one
+# bounded pool of solver processes. A session runs one optimization at a
+# time and may queue a few more; when every solver is busy and too many
+# sessions are already waiting, new optimizations are refused. The expenses
+# each session keeps in memory are capped as well.
+
+MAX_PENDING_PER_SESSION = 2
+MAX_EXPENSES_MIB = 64
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m expenses_app.web',
+        description='Serve o otimizador de gastos para vários usuários.',
+    )
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=8550)
+    parser.add_argument(
+        '--solvers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Otimizações executadas ao mesmo tempo',
+    )
+    parser.add_argument(
+        '--max-waiting',
+        type=int,
+        default=None,
+        help='Sessões esperando um otimizador antes de recusar novas '
+        '(padrão: 8 por otimizador)',
+    )
+    parser.add_argument(
+        '--max-pending',
+        type=int,
+        default=MAX_PENDING_PER_SESSION,
+        help='Otimizações na fila de cada sessão',
+    )
+    parser.add_argument(
+        '--max-expenses-mib',
+        type=int,
+        default=MAX_EXPENSES_MIB,
+        help='Memória máxima dos gastos de cada sessão',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None):
+    args = parse_args(argv)
+    configure_from_environment()
+
+    pool = SolverPool(
+        max_workers=args.solvers,
+        max_waiting=args.max_waiting or 8 * args.solvers,
+    )
+
+    def session(page: ft.Page):
+        app = Aplication(
+            solver_pool=pool,
+            max_pending=args.max_pending,
+            max_expenses_bytes=args.max_expenses_mib * 2**20,
+        )
+        app.main(page=page)
+
+    ft.app(
+        target=session,
+        host=args.host,
+        port=args.port,
+        view=ft.AppView.WEB_BROWSER,
+    )
+
+
+if __name__ == '__main__':
+    main()
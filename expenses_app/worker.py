@@ -0,0 +1,314 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Optional
+
+
+# The solver runs in its own process so a running job can be terminated;
+# 'spawn' avoids forking the multi-threaded Flet process.
+MP_CONTEXT = mp.get_context('spawn')
+
+POLL_INTERVAL = 0.5
+
+
+def solve_portfolio(portfolio, parameters, start_date):
+    from expenses_opt.optimization.optimizer import Optimizer
+
+    optimizer = Optimizer(
+        portfolio=portfolio,
+        parameters=parameters,
+        start_date=start_date,
+    )
+    optimizer.solve_optimization_problem()
+
+    return portfolio
+
+
+def _solve_in_process(portfolio, parameters, start_date, results):
+    try:
+        results.put(
+            (solve_portfolio(portfolio, parameters, start_date), None)
+        )
+    except Exception as err:
+        results.put((None, err))
+
+
+class JobStatus(Enum):
+    PENDING = 'Na fila'
+    RUNNING = 'Em execução'
+    DONE = 'Finalizada'
+    FAILED = 'Falhou'
+    CANCELLED = 'Cancelada'
+
+
+class OptimizationJob:
+    def __init__(
+        self,
+        portfolio,
+        parameters,
+        start_date,
+        on_done: Optional[Callable[['OptimizationJob'], Any]] = None,
+        key: Optional[str] = None,
+        window: Optional[int] = None,
+        target_choice: str = 'Desejável',
+    ) -> None:
+        self.portfolio = portfolio
+        self.parameters = parameters
+        self.start_date = start_date
+        self.on_done = on_done
+        self.key = key
+        # Periods per window of a rolling solve; None when every period is
+        # solved at once.
+        self.window = window
+        # The form's choice when the job was submitted; the dropdown may
+        # have changed by the time the job finishes.
+        self.target_choice = target_choice
+
+        self.status = JobStatus.PENDING
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (
+            JobStatus.DONE,
+            JobStatus.FAILED,
+            JobStatus.CANCELLED,
+        )
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at or time.monotonic()
+        return end - self.started_at
+
+    def progress(self) -> Optional[float]:
+        max_time = getattr(self.parameters, 'max_time', None)
+        if not max_time:
+            return None
+        return min(self.elapsed() / max_time, 1.0)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self, solve: Callable[[], Any]):
+        # Runs the job in the calling thread, for solves that start their
+        # own processes and so cannot be cancelled.
+        self.status = JobStatus.RUNNING
+        self.started_at = time.monotonic()
+        try:
+            self.result = solve()
+            self.status = JobStatus.DONE
+        except Exception as err:
+            self.error = err
+            self.status = JobStatus.FAILED
+        self.finished_at = time.monotonic()
+
+        if self.on_done is not None:
+            self.on_done(self)
+
+
+class PoolSaturatedError(RuntimeError):
+    pass
+
+
+# Solver slots shared by every session of a web deployment. Each session's
+# worker runs one job at a time and waits for a slot in arrival order, so
+# the sessions are served round-robin. Once too many sessions are waiting,
+# new jobs are refused instead of queued.
+class SolverPool:
+    def __init__(self, max_workers: int, max_waiting: int) -> None:
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self._free = max_workers
+        self._waiting: deque[threading.Event] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def saturated(self) -> bool:
+        with self._lock:
+            return self._free == 0 and len(self._waiting) >= self.max_waiting
+
+    def acquire(
+        self,
+        cancelled: Callable[[], bool],
+        on_wait: Optional[Callable[[], Any]] = None,
+    ) -> bool:
+        granted = threading.Event()
+        with self._lock:
+            if self._free > 0 and not self._waiting:
+                self._free -= 1
+                return True
+            self._waiting.append(granted)
+
+        while not granted.wait(POLL_INTERVAL):
+            if cancelled():
+                with self._lock:
+                    if granted in self._waiting:
+                        self._waiting.remove(granted)
+                        return False
+                # The slot was handed over while giving up.
+                self.release()
+                return False
+            if on_wait is not None:
+                on_wait()
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._waiting:
+                self._waiting.popleft().set()
+            else:
+                self._free += 1
+
+
+class OptimizationWorker:
+    def __init__(
+        self,
+        on_progress: Optional[Callable[[OptimizationJob], Any]] = None,
+        pool: Optional[SolverPool] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        self.on_progress = on_progress
+        self.pool = pool
+        self.max_pending = max_pending
+        self.current_job: Optional[OptimizationJob] = None
+        self._jobs: queue.Queue[OptimizationJob] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    @property
+    def busy(self) -> bool:
+        return self.current_job is not None or not self._jobs.empty()
+
+    def submit(self, job: OptimizationJob) -> OptimizationJob:
+        if self.max_pending is not None and self.pending >= self.max_pending:
+            raise PoolSaturatedError('Fila de otimizações da sessão cheia')
+        if self.pool is not None and self.pool.saturated:
+            raise PoolSaturatedError('Todos os otimizadores estão ocupados')
+
+        with self._lock:
+            self._jobs.put(job)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name='optimization-worker', daemon=True
+                )
+                self._thread.start()
+        return job
+
+    def cancel_current(self):
+        job = self.current_job
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self):
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            job.cancel()
+            self._finish(job, JobStatus.CANCELLED)
+        self.cancel_current()
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    self._thread = None
+                    return
+
+            if job.cancelled:
+                self._finish(job, JobStatus.CANCELLED)
+                continue
+
+            self.current_job = job
+            try:
+                if self.pool is None:
+                    self._run(job)
+                elif self.pool.acquire(
+                    cancelled=lambda: job.cancelled,
+                    on_wait=lambda: self._notify_progress(job),
+                ):
+                    try:
+                        self._run(job)
+                    finally:
+                        self.pool.release()
+                else:
+                    self._finish(job, JobStatus.CANCELLED)
+            finally:
+                self.current_job = None
+
+    def _run(self, job: OptimizationJob):
+        results = MP_CONTEXT.Queue()
+        process = MP_CONTEXT.Process(
+            target=_solve_in_process,
+            args=(job.portfolio, job.parameters, job.start_date, results),
+            daemon=True,
+        )
+        job.status = JobStatus.RUNNING
+        job.started_at = time.monotonic()
+        process.start()
+
+        outcome = None
+        while outcome is None:
+            if job.cancelled:
+                process.terminate()
+                break
+            try:
+                outcome = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not process.is_alive():
+                    outcome = self._drain(results)
+            self._notify_progress(job)
+
+        process.join()
+        results.close()
+
+        if outcome is None:
+            self._finish(job, JobStatus.CANCELLED)
+            return
+
+        job.result, job.error = outcome
+        status = JobStatus.FAILED if job.error else JobStatus.DONE
+        self._finish(job, status)
+
+    def _drain(self, results):
+        # The process may exit right after publishing its outcome.
+        try:
+            return results.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            return (
+                None,
+                RuntimeError('O processo do otimizador foi encerrado'),
+            )
+
+    def _notify_progress(self, job: OptimizationJob):
+        if self.on_progress is not None:
+            self.on_progress(job)
+
+    def _finish(self, job: OptimizationJob, status: JobStatus):
+        job.status = status
+        job.finished_at = time.monotonic()
+        if job.on_done is not None:
+            job.on_done(job)
@@ -0,0 +1,88 @@
+import json
+from expenses_app.batch import main
+
+
+HEADER = 'description,minimum,maximum,target,priority,mandatory,due_date\n'
+ROWS = (
+    'Aluguel,1000,1000,1000,alta,sim,05/01/2024\n'
+    'Mercado,400,800,600,alta,sim,10/02/2024\n'
+)
+
+
+def write_config(path, **parameters):
+    config = {
+        'start_date': '01/01/2024',
+        'budget': {
+            'initial': 2000,
+            'recorrent': 1000,
+            'recurrence': 'Mensal',
+            'last_recurrence': '01/02/2024',
+            'iterations': 2,
+        },
+        'parameters': {'max_time': 10, **parameters},
+    }
+    path.write_text(json.dumps(config), encoding='utf-8')
+
+
+def run(tmp_path, files: dict[str, str], **parameters):
+    inputs = tmp_path / 'entrada'
+    inputs.mkdir()
+    for name, text in files.items():
+        (inputs / name).write_text(text, encoding='utf-8')
+    write_config(tmp_path / 'config.json', **parameters)
+    output = tmp_path / 'saida'
+
+    code = main(
+        [
+            str(inputs),
+            '--config',
+            str(tmp_path / 'config.json'),
+            '--output',
+            str(output),
+            '--workers',
+            '1',
+        ]
+    )
+
+    summaries = json.loads((output / 'resumo.json').read_text('utf-8'))
+    return code, {
+        summary['file'].rsplit('/', 1)[-1]: summary for summary in summaries
+    }
+
+
+def test_a_broken_file_does_not_stop_the_batch(tmp_path):
+    # A field over the csv module's size limit makes the reader raise
+    # csv.Error half-way through the file.
+    huge = 'x' * 200_000
+    code, summaries = run(
+        tmp_path,
+        {
+            'bom.csv': HEADER + ROWS,
+            'quebrado.csv': HEADER + ROWS + f'"{huge}",1,2,1,alta,sim,'
+            '05/01/2024\n',
+        },
+    )
+
+    assert code == 1
+    assert summaries['bom.csv']['status'] == 'ok'
+    assert summaries['quebrado.csv']['status'] == 'error'
+    assert summaries['quebrado.csv']['error'].startswith('Error:')
+
+
+def test_overlap_must_be_smaller_than_the_window(tmp_path):
+    code, summaries = run(
+        tmp_path, {'gastos.csv': HEADER + ROWS}, window='2', overlap=2
+    )
+
+    assert code == 1
+    assert summaries['gastos.csv']['status'] == 'error'
+    assert 'sobreposição' in summaries['gastos.csv']['error']
+
+
+def test_window_given_as_a_string_is_used(tmp_path):
+    code, summaries = run(
+        tmp_path, {'gastos.csv': HEADER + ROWS}, window='1', overlap=0
+    )
+
+    assert code == 0
+    assert summaries['gastos.csv']['status'] == 'ok'
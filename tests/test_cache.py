@@ -0,0 +1,86 @@
+import os
+import pendulum
+from expenses_app.cache import ResultCache, portfolio_key
+from expenses_app.pipeline import build_budget, build_parameters
+from expenses_app.store import ExpenseStore
+
+
+START = pendulum.datetime(2024, 1, 1)
+BUDGET = build_budget(1000, 500, 'Mensal', START.add(days=60), 3, START)
+PARAMETERS = build_parameters(2, 0, 10)
+SPENDS = [[1.0, 2.0, 3.0], [0.0, 0.0, 4.5]]
+
+
+def make_store(rows=None) -> ExpenseStore:
+    store = ExpenseStore()
+    for row in rows or [
+        ('Aluguel', 1000.0, 1000.0, 1000.0, 1, True, 738900),
+        ('Mercado', 400.0, 800.0, 600.0, 1, True, 738910),
+    ]:
+        store.append_row(*row)
+    return store
+
+
+def key(store, budget=BUDGET, target_choice='Desejável') -> str:
+    return portfolio_key(store, budget, PARAMETERS, START, target_choice)
+
+
+def test_key_is_stable_for_the_same_expenses():
+    store = make_store()
+
+    assert key(store) == key(make_store())
+    assert key(store) == key(store.snapshot())
+
+
+def test_key_changes_with_expenses_and_settings():
+    store = make_store()
+    keys = {key(store)}
+
+    edited = make_store()
+    edited.update(2, target=650.0)
+    keys.add(key(edited))
+    renamed = make_store()
+    renamed.update(1, description='Aluguel novo')
+    keys.add(key(renamed))
+    keys.add(key(store, target_choice='Máximo'))
+    longer = build_budget(1000, 500, 'Mensal', START.add(days=90), 4, START)
+    keys.add(key(store, budget=longer))
+
+    assert len(keys) == 5
+
+
+def test_memory_keeps_the_most_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', SPENDS)
+    cache.put('b', SPENDS)
+
+    cache.get('a')
+    cache.put('c', SPENDS)
+
+    assert len(cache) == 2
+    assert 'a' in cache
+    assert 'b' not in cache
+
+
+def test_results_survive_a_new_cache(tmp_path):
+    ResultCache(directory=str(tmp_path)).put('a', SPENDS)
+
+    cache = ResultCache(directory=str(tmp_path))
+
+    assert cache.get('a') == SPENDS
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_disk_keeps_the_most_recently_used(tmp_path):
+    directory = str(tmp_path)
+    cache = ResultCache(max_entries=2, directory=directory)
+    cache.put('a', SPENDS)
+    cache.put('b', SPENDS)
+    os.utime(tmp_path / 'a.json', (1000, 1000))
+    os.utime(tmp_path / 'b.json', (2000, 2000))
+
+    # Reading from disk marks 'a' as used, so 'b' is the one dropped.
+    assert ResultCache(max_entries=2, directory=directory).get('a') == SPENDS
+    cache.put('c', SPENDS)
+
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'c.json']
@@ -0,0 +1,144 @@
+from unittest import mock
+import pendulum
+import pytest
+from expenses_app import decompose
+from expenses_app.decompose import (
+    solution_quality,
+    solve_decomposed,
+    split_portfolio,
+)
+from expenses_app.pipeline import build_budget, build_parameters
+from expenses_app.store import ExpenseStore
+
+
+START = pendulum.datetime(2024, 1, 1)
+BUDGET = build_budget(1000, 500, 'Mensal', START.add(days=60), 3, START)
+# description: (target, days until due)
+ROWS = {
+    'Aluguel': (1000, 5),
+    'Seguro': (300, 80),
+    'Mercado': (600, 10),
+    'Luz': (200, 40),
+    'Internet': (100, 70),
+    'Cinema': (50, 35),
+}
+
+
+def make_store() -> ExpenseStore:
+    store = ExpenseStore()
+    for description, (target, days) in ROWS.items():
+        store.append_row(
+            description=description,
+            minimum=0,
+            maximum=target,
+            target=target,
+            priority=1,
+            mandatory=False,
+            due_date=START.add(days=days).toordinal(),
+        )
+    return store
+
+
+class InlineExecutor:
+    # Runs the parts one after the other in this process, so the solver
+    # below replaces the optimizer.
+    def __init__(self, **options) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+
+def spend_target_first(portfolio, parameters, start_date):
+    for expense in portfolio.expenses:
+        expense.partial_spends = [expense.range.target, 0.0, 0.0]
+    return portfolio
+
+
+def names(subproblem) -> list[str]:
+    return list(subproblem.expenses.column('description'))
+
+
+def test_due_date_parts_are_consecutive_windows():
+    parts = split_portfolio(make_store(), BUDGET, START, parts=3)
+
+    assert [names(part) for part in parts] == [
+        ['Aluguel', 'Mercado'],
+        ['Luz', 'Cinema'],
+        ['Seguro', 'Internet'],
+    ]
+    assert [part.indices for part in parts] == [[0, 2], [3, 5], [1, 4]]
+
+
+def test_balanced_parts_span_the_horizon():
+    parts = split_portfolio(
+        make_store(), BUDGET, START, parts=2, strategy='balanced'
+    )
+
+    # Dealt out in due date order (Aluguel, Mercado, Cinema, Luz, ...);
+    # each part keeps the store's order.
+    assert [names(part) for part in parts] == [
+        ['Aluguel', 'Internet', 'Cinema'],
+        ['Seguro', 'Mercado', 'Luz'],
+    ]
+
+
+def test_budget_is_shared_by_target():
+    parts = split_portfolio(make_store(), BUDGET, START, parts=2)
+
+    total = sum(target for target, _ in ROWS.values())
+    first = (1000 + 600 + 50) / total
+    assert parts[0].budget.initial == round(1000 * first, 2)
+    assert parts[1].budget.recorrent == round(500 * (1 - first), 2)
+    assert parts[0].budget.iterations == BUDGET.iterations
+
+
+def test_more_parts_than_expenses():
+    parts = split_portfolio(make_store(), BUDGET, START, parts=10)
+
+    assert len(parts) == len(ROWS)
+    assert sorted(index for part in parts for index in part.indices) == list(
+        range(len(ROWS))
+    )
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        split_portfolio(make_store(), BUDGET, START, 2, strategy='aleatória')
+
+
+@pytest.mark.parametrize('strategy', ['due_date', 'balanced'])
+@pytest.mark.parametrize('parts', [1, 2, 4])
+def test_spends_come_back_in_store_order(strategy, parts):
+    with mock.patch.object(
+        decompose, 'ProcessPoolExecutor', InlineExecutor
+    ), mock.patch.object(decompose, 'solve_portfolio', spend_target_first):
+        spends = solve_decomposed(
+            expenses=make_store(),
+            budget=BUDGET,
+            parameters=build_parameters(2, 0, 10),
+            start_date=START,
+            parts=parts,
+            strategy=strategy,
+        )
+
+    assert spends == [[target, 0.0, 0.0] for target, _ in ROWS.values()]
+
+
+def test_solution_quality():
+    quality = solution_quality(
+        [[100, 50], [0, 0], [30, 0]], targets=[120, 10, 30]
+    )
+
+    assert quality.total_spend == 180
+    assert quality.deviation == 40
+    assert quality.gap(solution_quality([[200]], [100])) == {
+        'total_spend': -0.1,
+        'deviation': -0.6,
+    }
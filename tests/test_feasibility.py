@@ -0,0 +1,151 @@
+import pendulum
+from expenses_app.feasibility import MAX_NAMED, check_feasibility
+from expenses_app.pipeline import build_budget
+from expenses_app.store import ExpenseStore
+
+
+START = pendulum.datetime(2024, 1, 1)
+
+
+def monthly_budget(initial=1000.0, recorrent=500.0, iterations=3):
+    # Money comes in at the start of every period.
+    return build_budget(
+        initial=initial,
+        recorrent=recorrent,
+        recurrence='Mensal',
+        last_recurrence_date=START.add(days=30 * (iterations - 1)),
+        iterations=iterations,
+        start_date=START,
+    )
+
+
+def add(store, description, minimum, days, mandatory=True, maximum=None):
+    maximum = minimum if maximum is None else maximum
+    store.append_row(
+        description=description,
+        minimum=minimum,
+        maximum=maximum,
+        target=minimum,
+        priority=1,
+        mandatory=mandatory,
+        due_date=START.add(days=days).toordinal(),
+    )
+
+
+def test_empty_store_is_feasible():
+    report = check_feasibility(ExpenseStore(), monthly_budget(), START)
+
+    assert report.feasible
+    assert report.messages() == []
+
+
+def test_mandatory_minimums_within_budget():
+    store = ExpenseStore()
+    add(store, 'Aluguel', 1000, days=5)
+    add(store, 'Mercado', 500, days=40)
+    add(store, 'Viagem', 5000, days=10, mandatory=False)
+
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert report.feasible
+    assert report.messages() == []
+
+
+def test_shortfall_in_the_first_period():
+    store = ExpenseStore()
+    add(store, 'Aluguel', 900, days=5)
+    add(store, 'Mercado', 600, days=20)
+
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert not report.feasible
+    shortfall = report.shortfall
+    assert shortfall.period == 0
+    assert shortfall.required == 1500
+    assert shortfall.available == 1000
+    assert shortfall.expenses == [('Aluguel', 900), ('Mercado', 600)]
+    assert 'Mês 1' in report.messages('Mês')[0]
+
+
+def test_shortfall_is_cumulative():
+    # 1000 + 500 received by period 2 against 1000 + 800 due by then.
+    store = ExpenseStore()
+    add(store, 'Aluguel', 1000, days=5)
+    add(store, 'Mercado', 800, days=40)
+    add(store, 'Internet', 100, days=70)
+
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert report.shortfall.period == 1
+    assert report.shortfall.required == 1800
+    assert report.shortfall.available == 1500
+    assert [name for name, _ in report.shortfall.expenses] == [
+        'Aluguel',
+        'Mercado',
+    ]
+
+
+def test_expenses_due_after_the_horizon_count_in_the_last_period():
+    store = ExpenseStore()
+    add(store, 'Seguro', 2500, days=365)
+
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert report.shortfall.period == 2
+    assert report.shortfall.available == 2000
+
+
+def test_names_the_largest_expenses_first():
+    store = ExpenseStore()
+    for number in range(MAX_NAMED + 2):
+        add(store, f'Gasto {number}', 100 + number * 10, days=5)
+
+    report = check_feasibility(store, monthly_budget(initial=0), START)
+
+    named = [name for name, _ in report.shortfall.expenses]
+    assert named == [f'Gasto {number}' for number in range(6, 1, -1)]
+    assert report.shortfall.others == 2
+    assert 'e mais 2' in report.messages()[0]
+
+
+def test_invalid_ranges():
+    store = ExpenseStore()
+    add(store, 'Invertido', 200, days=5, maximum=100)
+    store.append_row('Alvo alto', 0, 100, 150, 2, False, START.toordinal())
+    add(store, 'Certo', 10, days=5, maximum=20)
+
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert not report.feasible
+    assert report.shortfall is None
+    assert report.invalid_ranges == ['Invertido', 'Alvo alto']
+    assert 'Invertido, Alvo alto' in report.messages()[0]
+
+
+def test_overdue_expenses_are_only_reported_with_a_problem():
+    store = ExpenseStore()
+    add(store, 'Multa', 300, days=-10)
+
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert report.feasible
+    assert report.overdue == ['Multa']
+    assert report.messages() == []
+
+    add(store, 'Aluguel', 900, days=5)
+    report = check_feasibility(store, monthly_budget(), START)
+
+    assert report.shortfall.period == 0
+    assert report.shortfall.required == 1200
+    assert 'vencidos antes do início: Multa' in report.messages()[-1]
+
+
+def test_target_choice_checks_the_chosen_column():
+    store = ExpenseStore()
+    store.append_row('Mercado', 100, 200, 250, 1, False, START.toordinal())
+
+    budget = monthly_budget()
+    assert not check_feasibility(store, budget, START).feasible
+    assert check_feasibility(
+        store, budget, START, target_choice='Máximo'
+    ).feasible
@@ -0,0 +1,136 @@
+import pytest
+from expenses_app.importer import ImportReport, iter_expense_chunks
+
+
+HEADER = 'description,minimum,maximum,target,priority,mandatory,due_date\n'
+
+
+def write_csv(tmp_path, text: str, name: str = 'gastos.csv') -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def read_all(path: str, chunk_size: int = 500):
+    chunks = list(iter_expense_chunks(path, chunk_size=chunk_size))
+    expenses = [expense for chunk in chunks for expense in chunk.expenses]
+    skipped = [row for chunk in chunks for row in chunk.skipped]
+    return chunks, expenses, skipped
+
+
+def test_reports_each_skipped_row_by_line(tmp_path):
+    path = write_csv(
+        tmp_path,
+        HEADER
+        + 'Aluguel,1000,1000,1000,alta,sim,05/01/2024\n'
+        + 'Mercado,abc,800,600,alta,sim,10/01/2024\n'
+        + 'Cinema,0,100,50,urgente,não,15/01/2024\n'
+        + '\n'
+        + 'Academia,80,120,100,média,não,31/02/2024\n'
+        + ',1,2,1,baixa,não,01/02/2024\n'
+        + 'Internet,100,100\n'
+        + 'Luz,200,100,150,alta,sim,01/02/2024\n'
+        + 'Gás,1,2,1,baixa,talvez,01/02/2024\n'
+        + 'Água,"1.234,56","2.000","1.500",2,1,2024-02-10\n',
+    )
+
+    _, expenses, skipped = read_all(path)
+
+    assert [expense.description for expense in expenses] == [
+        'Aluguel',
+        'Água',
+    ]
+    assert expenses[1].range.minimum == 1234.56
+    assert expenses[1].range.maximum == 2000.0
+    assert [line for line, _ in skipped] == [3, 4, 6, 7, 8, 9, 10]
+    reasons = dict(skipped)
+    assert reasons[3] == 'preço inválido'
+    assert 'urgente' in reasons[4]
+    assert '31/02/2024' in reasons[6]
+    assert reasons[7] == 'nome do gasto vazio'
+    assert reasons[8] == 'número de colunas incorreto'
+    assert 'ordem' in reasons[9]
+    assert 'talvez' in reasons[10]
+
+
+def test_line_numbers_count_quoted_newlines(tmp_path):
+    path = write_csv(
+        tmp_path,
+        HEADER
+        + '"Conta\nde luz",1,2,1,alta,sim,05/01/2024\n'
+        + 'Ruim,x,2,1,alta,sim,05/01/2024\n',
+    )
+
+    _, expenses, skipped = read_all(path)
+
+    assert expenses[0].description == 'Conta\nde luz'
+    assert skipped == [(4, 'preço inválido')]
+
+
+def test_chunks_split_rows_and_end_at_full_progress(tmp_path):
+    rows = ''.join(
+        f'Gasto {i},1,2,1,baixa,não,05/01/2024\n' for i in range(7)
+    ) + 'Ruim,1,2,1,baixa,não,amanhã\n'
+    path = write_csv(tmp_path, HEADER + rows)
+
+    chunks, expenses, skipped = read_all(path, chunk_size=3)
+
+    sizes = [len(chunk.expenses) + len(chunk.skipped) for chunk in chunks]
+    assert sizes == [3, 3, 2]
+    assert len(expenses) == 7
+    assert skipped == [(9, 'data inválida "amanhã"')]
+    progress = [chunk.progress for chunk in chunks]
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+
+
+def test_reads_semicolons_and_portuguese_headers(tmp_path):
+    path = write_csv(
+        tmp_path,
+        'Nome;Preço mínimo;Preço máximo;Preço desejável;Prioridade;'
+        'Obrigatório;Data limite\n'
+        'Aluguel;1.000,00;1.000,00;1.000,00;Alta;Sim;05/01/2024\n',
+    )
+
+    _, expenses, skipped = read_all(path)
+
+    assert skipped == []
+    assert expenses[0].range.target == 1000.0
+    assert expenses[0].mandatory is True
+
+
+def test_missing_column_fails_the_file(tmp_path):
+    path = write_csv(tmp_path, 'description,minimum\nAluguel,1\n')
+
+    with pytest.raises(ValueError, match='maximum'):
+        list(iter_expense_chunks(path))
+
+
+def test_report_summary_counts_repeated_and_skipped(tmp_path):
+    path = write_csv(
+        tmp_path,
+        HEADER
+        + 'Aluguel,1000,1000,1000,alta,sim,05/01/2024\n'
+        + 'Mercado,x,800,600,alta,sim,10/01/2024\n',
+    )
+    report = ImportReport()
+
+    for chunk in iter_expense_chunks(path):
+        report.add(chunk, added=0)
+
+    assert report.imported == 0
+    assert report.repeated == 1
+    assert report.summary() == (
+        '0 gastos importados. 1 já existentes foram ignorados. '
+        '1 linhas ignoradas:\nLinha 3: preço inválido'
+    )
+
+
+def test_unreadable_files_are_reported_without_a_line():
+    report = ImportReport()
+    report.errors.append('gastos.csv: arquivo não encontrado')
+
+    assert report.summary() == (
+        '0 gastos importados.\n'
+        'Arquivo não lido: gastos.csv: arquivo não encontrado'
+    )
@@ -0,0 +1,106 @@
+import pytest
+from expenses_app.parsing import (
+    at_least,
+    parse_amount,
+    parse_date,
+    parse_integer,
+    parse_priority,
+)
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        ('10', 10.0),
+        ('10.50', 10.5),
+        ('1234.56', 1234.56),
+        ('10,5', 10.5),
+        ('1.234,56', 1234.56),
+        ('2.000', 2000.0),
+        ('1.000.000', 1000000.0),
+        ('R$ 2.000,00', 2000.0),
+        ('R$1,99', 1.99),
+        ('  42  ', 42.0),
+        ('-3,5', -3.5),
+        ('0,333', 0.33),
+    ],
+)
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+def test_a_dot_before_three_digits_is_a_thousands_separator():
+    # The rule documented in the README: 1.500 is never one and a half.
+    assert parse_amount('1.500') == 1500.0
+    assert parse_amount('1.50') == 1.5
+    assert parse_amount('1.5000') == 1.5
+
+
+@pytest.mark.parametrize(
+    'value', ['', 'abc', '1,2,3', '1.23,4', '12,34.5', 'nan', 'inf', 'R$']
+)
+def test_parse_amount_rejects(value):
+    with pytest.raises(ValueError):
+        parse_amount(value)
+
+
+def test_parse_integer_drops_decimals():
+    assert parse_integer('3,7') == 3
+    assert parse_integer('12') == 12
+
+
+def test_at_least():
+    parse = at_least(1)
+
+    assert parse('1') == 1
+    with pytest.raises(ValueError, match='pelo menos 1'):
+        parse('0')
+
+
+@pytest.mark.parametrize(
+    'value',
+    ['05/03/2024', '5/3/2024', ' 05/03/2024 ', '2024-03-05', '2024-3-5'],
+)
+def test_parse_date_formats(value):
+    date = parse_date(value)
+
+    assert (date.year, date.month, date.day) == (2024, 3, 5)
+
+
+def test_parse_date_ignores_an_iso_time():
+    date = parse_date('2024-03-05T18:30:00')
+
+    assert (date.year, date.month, date.day) == (2024, 3, 5)
+    assert (date.hour, date.minute) == (0, 0)
+
+
+def test_parse_date_reuses_dates():
+    assert parse_date('29/02/2024') is parse_date('2024-02-29')
+
+
+@pytest.mark.parametrize('value', ['31/02/2024', '29/02/2023', '2024-13-01'])
+def test_parse_date_rejects_missing_days(value):
+    with pytest.raises(ValueError, match='inexistente'):
+        parse_date(value)
+
+
+@pytest.mark.parametrize(
+    'value',
+    ['', 'amanhã', '05-03-2024', '2024/03/05', '05/03/24', '202403051'],
+)
+def test_parse_date_rejects_other_formats(value):
+    with pytest.raises(ValueError, match='DD/MM/AAAA'):
+        parse_date(value)
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [('Alta', 1), (' média ', 2), ('media', 2), ('BAIXA', 3), ('3', 3)],
+)
+def test_parse_priority(value, expected):
+    assert parse_priority(value) == expected
+
+
+def test_parse_priority_rejects_unknown_names():
+    with pytest.raises(ValueError, match='urgente'):
+        parse_priority('urgente')
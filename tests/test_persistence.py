@@ -0,0 +1,93 @@
+import pendulum
+import pytest
+from expenses_app.persistence import PortfolioDatabase
+from expenses_app.pipeline import build_budget, build_parameters
+from expenses_app.store import ExpenseStore
+
+
+START = pendulum.datetime(2024, 1, 1)
+PORTFOLIO = 'Principal'
+NAMES = ['A', 'B', 'Aluguel', 'Mercado']
+
+
+@pytest.fixture
+def database():
+    database = PortfolioDatabase()
+    yield database
+    database.close()
+
+
+def make_store() -> ExpenseStore:
+    store = ExpenseStore()
+    for name in NAMES:
+        store.append_row(name, 0, 100, 50, 1, False, START.toordinal() + 40)
+    return store
+
+
+def record_solved_run(database, store) -> int:
+    # Stands in for a solve: expense n spends n in every period.
+    budget = build_budget(1000, 100, 'Mensal', START.add(days=30), 2, START)
+    portfolio = store.to_portfolio(budget)
+    for number, expense in enumerate(portfolio.expenses):
+        expense.partial_spends = [float(number), float(number)]
+    return database.record_run(
+        portfolio=PORTFOLIO,
+        solved=portfolio,
+        parameters=build_parameters(2, 0, 10),
+        start_date=START,
+        target_choice='Desejável',
+    )
+
+
+def saved(database, run_id) -> list[tuple[str, list[float]]]:
+    return [
+        (result.description, result.partial_spends)
+        for result in database.run_results(run_id)
+    ]
+
+
+EXPECTED = [
+    ('A', [0.0, 0.0]),
+    ('B', [1.0, 1.0]),
+    ('Aluguel', [2.0, 2.0]),
+    ('Mercado', [3.0, 3.0]),
+]
+
+
+def test_run_results_read_back_the_solved_run(database):
+    store = make_store()
+    database.save_expenses(PORTFOLIO, store)
+
+    run_id = record_solved_run(database, store)
+
+    assert saved(database, run_id) == EXPECTED
+    assert database.runs(PORTFOLIO)[0].total_spend == 12.0
+
+
+def test_deleting_an_expense_keeps_earlier_runs(database):
+    store = make_store()
+    database.save_expenses(PORTFOLIO, store)
+    run_id = record_solved_run(database, store)
+
+    # The same steps as deleting from the expenses table: Mercado moves
+    # into A's position.
+    position, moved = store.delete(1)
+    database.update_expenses(PORTFOLIO, store, [position] if moved else [])
+
+    assert saved(database, run_id) == EXPECTED
+    loaded = database.load_expenses(PORTFOLIO)
+    assert list(loaded.column('description')) == ['Mercado', 'B', 'Aluguel']
+
+
+def test_editing_an_expense_keeps_earlier_runs(database):
+    store = make_store()
+    database.save_expenses(PORTFOLIO, store)
+    run_id = record_solved_run(database, store)
+
+    position = store.update(3, description='Aluguel novo')
+    database.update_expenses(PORTFOLIO, store, [position])
+
+    assert saved(database, run_id) == EXPECTED
+    assert database.load_expenses(PORTFOLIO).record(2).description == (
+        'Aluguel novo'
+    )
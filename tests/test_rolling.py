@@ -0,0 +1,131 @@
+from unittest import mock
+import pendulum
+import pytest
+from expenses_app import rolling
+from expenses_app.pipeline import build_budget, build_parameters
+from expenses_app.rolling import solve_rolling, window_count
+from expenses_app.store import ExpenseStore
+
+
+START = pendulum.datetime(2024, 1, 1)
+PERIODS = 5
+
+
+def make_store(due_periods: dict[str, tuple[int, float]]) -> ExpenseStore:
+    store = ExpenseStore()
+    for description, (period, target) in due_periods.items():
+        store.append_row(
+            description=description,
+            minimum=0,
+            maximum=target,
+            target=target,
+            priority=1,
+            mandatory=False,
+            due_date=START.add(days=30 * period + 5).toordinal(),
+        )
+    return store
+
+
+def monthly_budget():
+    # 1000 at the start, then 500 at the start of every later period.
+    return build_budget(
+        initial=1000,
+        recorrent=500,
+        recurrence='Mensal',
+        last_recurrence_date=START.add(days=30 * (PERIODS - 1)),
+        iterations=PERIODS,
+        start_date=START,
+    )
+
+
+class PayOnDueDate:
+    # Stands in for the solver: every expense offered to a window spends
+    # its target in the period it is due, and each call is recorded.
+    def __init__(self) -> None:
+        self.windows = []
+
+    def __call__(self, portfolio, parameters, start_date):
+        periods = portfolio.budget.iterations
+        self.windows.append(
+            {
+                'start': (start_date - START).days,
+                'periods': periods,
+                'initial': portfolio.budget.initial,
+                'expenses': [e.description for e in portfolio.expenses],
+            }
+        )
+        for expense in portfolio.expenses:
+            due = min((expense.due_date - start_date).days // 30, periods - 1)
+            expense.partial_spends = [0.0] * periods
+            expense.partial_spends[due] = expense.range.target
+        return portfolio
+
+
+def solve(store, window, overlap=0):
+    solver = PayOnDueDate()
+    with mock.patch.object(rolling, 'solve_portfolio', solver):
+        spends = solve_rolling(
+            expenses=store,
+            budget=monthly_budget(),
+            parameters=build_parameters(2, 0, 10),
+            start_date=START,
+            window=window,
+            overlap=overlap,
+        )
+    return spends, solver.windows
+
+
+@pytest.mark.parametrize(
+    'window, overlap, expected',
+    [(5, 0, 1), (6, 2, 1), (2, 0, 3), (3, 1, 2), (2, 1, 4), (4, 3, 2)],
+)
+def test_window_count(window, overlap, expected):
+    assert window_count(PERIODS, window, overlap) == expected
+
+
+def test_unspent_money_is_carried_into_the_next_window():
+    store = make_store(
+        {'Aluguel': (0, 300), 'Luz': (1, 200), 'Seguro': (3, 100)}
+    )
+
+    spends, windows = solve(store, window=2)
+
+    assert spends == [
+        [300, 0, 0, 0, 0],
+        [0, 200, 0, 0, 0],
+        [0, 0, 0, 100, 0],
+    ]
+    # Window 2: 1000 + 500 received, 500 spent, plus its own 500.
+    assert [w['initial'] for w in windows] == [1000, 1500]
+    assert [w['expenses'] for w in windows] == [['Aluguel', 'Luz'], ['Seguro']]
+
+
+def test_the_last_window_is_shorter_when_the_horizon_does_not_divide():
+    store = make_store({'Aluguel': (0, 300), 'Multa': (4, 50)})
+
+    spends, windows = solve(store, window=2)
+
+    assert [(w['start'], w['periods']) for w in windows] == [(0, 2), (120, 1)]
+    # The middle window has nothing due and is not solved. The last one
+    # gets the 2500 received before it, less the 300 spent, plus its 500.
+    assert windows[-1]['initial'] == 2700
+    assert spends == [[300, 0, 0, 0, 0], [0, 0, 0, 0, 50]]
+
+
+def test_overlapping_periods_are_solved_again_by_the_next_window():
+    store = make_store({'Luz': (2, 200), 'Multa': (4, 50)})
+
+    spends, windows = solve(store, window=3, overlap=1)
+
+    # The first window pays Luz in period 2, which is not kept: the second
+    # window starts at period 2 and pays it again with both overlapping
+    # periods' money still available.
+    assert [(w['start'], w['periods']) for w in windows] == [(0, 3), (60, 3)]
+    assert [w['expenses'] for w in windows] == [['Luz'], ['Luz', 'Multa']]
+    assert windows[1]['initial'] == 2000
+    assert spends == [[0, 0, 200, 0, 0], [0, 0, 0, 0, 50]]
+
+
+def test_overlap_must_be_smaller_than_the_window():
+    with pytest.raises(ValueError):
+        solve(make_store({}), window=2, overlap=2)
@@ -0,0 +1,198 @@
+import pytest
+from expenses_app.store import ExpenseStore, StoreFullError
+
+
+ROWS = [
+    # description, minimum, maximum, target, priority, mandatory, due_date
+    ('Aluguel', 1000.0, 1000.0, 1000.0, 1, True, 738900),
+    ('Mercado', 400.0, 800.0, 600.0, 1, True, 738910),
+    ('Cinema', 0.0, 100.0, 50.0, 3, False, 738905),
+    ('Academia', 80.0, 120.0, 100.0, 2, False, 738900),
+    ('Internet', 100.0, 100.0, 100.0, 2, True, 738920),
+]
+
+
+def make_store(rows=ROWS) -> ExpenseStore:
+    store = ExpenseStore()
+    for row in rows:
+        store.append_row(*row)
+    return store
+
+
+def scan(store: ExpenseStore, **filters) -> list[int]:
+    # What query should return, by looking at every row.
+    positions = []
+    for position in range(len(store)):
+        record = store.record(position)
+        if (
+            'priority' in filters
+            and record.priority != filters['priority']
+        ):
+            continue
+        if (
+            'mandatory' in filters
+            and record.mandatory != filters['mandatory']
+        ):
+            continue
+        if (
+            'due_before' in filters
+            and record.due_date >= filters['due_before']
+        ):
+            continue
+        positions.append(position)
+    return positions
+
+
+def assert_indexes_match(store: ExpenseStore):
+    for filters in (
+        {'priority': 1},
+        {'priority': 2},
+        {'priority': 3},
+        {'mandatory': True},
+        {'mandatory': False},
+        {'due_before': 738906},
+        {'priority': 2, 'mandatory': True},
+    ):
+        assert store.query(**filters) == scan(store, **filters)
+    for position in range(len(store)):
+        record = store.record(position)
+        assert store.position_of(record.id) == position
+
+
+def test_append_row_gives_increasing_ids():
+    store = make_store()
+
+    assert list(store.column('id')) == [1, 2, 3, 4, 5]
+    assert store.get(3).description == 'Cinema'
+    assert store.next_id == 6
+
+
+def test_query_filters_and_orders():
+    store = make_store()
+
+    assert store.query() == [0, 1, 2, 3, 4]
+    assert store.query(descending=True) == [4, 3, 2, 1, 0]
+    assert store.query(priority=1) == [0, 1]
+    assert store.query(mandatory=False) == [2, 3]
+    assert store.query(due_before=738906) == [0, 2, 3]
+    # Ties keep store order.
+    assert store.query(order_by='due_date') == [0, 3, 2, 1, 4]
+    assert store.query(order_by='priority', descending=True) == [2, 3, 4, 0, 1]
+    assert store.query(order_by='due_date', mandatory=True) == [0, 1, 4]
+
+
+def test_update_moves_the_row_between_index_groups():
+    store = make_store()
+    store.query(priority=1)  # builds the indexes
+
+    position = store.update(3, priority=1, mandatory=True, due_date=738901)
+
+    assert position == 2
+    assert store.get(3).priority == 1
+    assert store.query(priority=3) == []
+    assert store.query(priority=1) == [0, 1, 2]
+    assert_indexes_match(store)
+
+
+def test_update_rejects_unknown_columns():
+    store = make_store()
+
+    with pytest.raises(ValueError):
+        store.update(1, id=10)
+    with pytest.raises(KeyError):
+        store.update(99, priority=1)
+
+
+def test_delete_moves_the_last_row_into_the_gap():
+    store = make_store()
+    store.query(priority=1)
+
+    position, moved = store.delete(2)
+
+    assert (position, moved) == (1, True)
+    assert len(store) == 4
+    assert store.record(1).description == 'Internet'
+    assert store.position_of(5) == 1
+    with pytest.raises(KeyError):
+        store.position_of(2)
+    assert_indexes_match(store)
+
+
+def test_delete_the_last_row_moves_nothing():
+    store = make_store()
+
+    position, moved = store.delete(5)
+
+    assert (position, moved) == (4, False)
+    assert [record.id for record in map(store.record, range(4))] == [
+        1,
+        2,
+        3,
+        4,
+    ]
+    assert_indexes_match(store)
+
+
+def test_indexes_follow_a_mix_of_changes():
+    store = make_store()
+    store.query(priority=1)
+
+    store.delete(1)
+    store.append_row('Farmácia', 20.0, 60.0, 40.0, 3, True, 738902)
+    store.update(4, priority=3, due_date=738930)
+    store.delete(3)
+    store.delete(6)
+
+    assert sorted(store.column('id')) == [2, 4, 5]
+    assert_indexes_match(store)
+
+
+def test_delete_keeps_the_byte_count():
+    store = make_store()
+    empty = ExpenseStore()
+    empty.append_row(*ROWS[0])
+
+    for expense_id in (2, 3, 4, 5):
+        store.delete(expense_id)
+
+    assert store.nbytes == empty.nbytes
+
+
+def test_snapshot_is_not_changed_by_writes_to_the_store():
+    store = make_store()
+    snapshot = store.snapshot()
+
+    store.update(1, minimum=900.0)
+    store.delete(2)
+    store.append_row('Novo', 1.0, 2.0, 1.5, 2, False, 738950)
+
+    assert len(snapshot) == 5
+    assert snapshot.record(0).minimum == 1000.0
+    assert snapshot.record(1).description == 'Mercado'
+    assert store.record(0).minimum == 900.0
+    assert store.record(1).description == 'Internet'
+
+
+def test_store_is_not_changed_by_writes_to_a_snapshot():
+    store = make_store()
+    snapshot = store.snapshot()
+
+    snapshot.update(1, description='Aluguel novo')
+    snapshot.delete(5)
+
+    assert len(store) == 5
+    assert store.record(0).description == 'Aluguel'
+    assert snapshot.record(0).description == 'Aluguel novo'
+    assert_indexes_match(store)
+    assert_indexes_match(snapshot)
+
+
+def test_max_bytes_limits_appends():
+    store = make_store()
+    limited = ExpenseStore(max_bytes=store.nbytes)
+    for row in ROWS:
+        limited.append_row(*row)
+
+    with pytest.raises(StoreFullError):
+        limited.append_row(*ROWS[0])
+    assert len(limited) == len(ROWS)
@@ -0,0 +1,70 @@
+from unittest import mock
+import pendulum
+import pytest
+from expenses_app import sweep
+from expenses_app.pipeline import build_budget
+from expenses_app.store import ExpenseStore
+from expenses_app.sweep import Scenario, parse_values, solve_scenario
+
+
+START = pendulum.datetime(2024, 1, 1)
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('2', [2.0]),
+        ('2; 2,5; 3', [2.0, 2.5, 3.0]),
+        ('1:3', [1.0, 2.0, 3.0]),
+        ('0:1:0,25', [0.0, 0.25, 0.5, 0.75, 1.0]),
+        # The step does not reach the stop, which is left out.
+        ('0:1:0,4', [0.0, 0.4, 0.8]),
+        ('0:0,3:0,1', [0.0, 0.1, 0.2, 0.3]),
+        ('1; 5:6; ', [1.0, 5.0, 6.0]),
+        ('3:1', []),
+    ],
+)
+def test_parse_values(text, expected):
+    if not expected:
+        with pytest.raises(ValueError, match='ao menos um valor'):
+            parse_values(text)
+    else:
+        assert parse_values(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', ' ; ', 'abc', '1:x', '1:2:3:4'])
+def test_parse_values_rejects(text):
+    with pytest.raises(ValueError):
+        parse_values(text)
+
+
+@pytest.mark.parametrize('text', ['0:1:0', '0:1:-1'])
+def test_parse_values_rejects_steps_that_do_not_advance(text):
+    with pytest.raises(ValueError, match='passo'):
+        parse_values(text)
+
+
+def spend_everything(portfolio, parameters, start_date):
+    # Each expense spends its optimization target in the first period.
+    for expense in portfolio.expenses:
+        expense.partial_spends = [expense.range.target, 0.0]
+    return portfolio
+
+
+@pytest.mark.parametrize(
+    'target_choice, deviation',
+    [('Mínimo', 200.0), ('Desejável', 0.0), ('Máximo', 300.0)],
+)
+def test_deviation_is_measured_from_the_desired_price(
+    target_choice, deviation
+):
+    store = ExpenseStore()
+    store.append_row('Mercado', 400, 800, 600, 1, True, START.toordinal())
+    store.append_row('Cinema', 0, 100, 0, 3, False, START.toordinal())
+    budget = build_budget(1000, 500, 'Mensal', START.add(days=30), 2, START)
+    scenario = Scenario(2, 0, target_choice=target_choice)
+
+    with mock.patch.object(sweep, 'solve_portfolio', spend_everything):
+        result = solve_scenario(scenario, store, budget, 10, START)
+
+    assert result.deviation == deviation
@@ -0,0 +1,166 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from expenses_app import worker
+from expenses_app.worker import (
+    JobStatus,
+    OptimizationJob,
+    OptimizationWorker,
+    PoolSaturatedError,
+    SolverPool,
+)
+
+
+# Runs in the spawned solver process instead of the optimizer: sleeps for
+# parameters.seconds and returns the portfolio, here just a name.
+def sleep_and_return(portfolio, parameters, start_date, results):
+    time.sleep(parameters.seconds)
+    if portfolio == 'falha':
+        results.put((None, ValueError('sem solução')))
+    else:
+        results.put((portfolio, None))
+
+
+@pytest.fixture(autouse=True)
+def trivial_solver(monkeypatch):
+    monkeypatch.setattr(worker, '_solve_in_process', sleep_and_return)
+    monkeypatch.setattr(worker, 'POLL_INTERVAL', 0.05)
+
+
+class Jobs:
+    # Collects the jobs as they finish, in order.
+    def __init__(self) -> None:
+        self.finished: list[OptimizationJob] = []
+        self._condition = threading.Condition()
+
+    def make(self, name: str, seconds: float) -> OptimizationJob:
+        return OptimizationJob(
+            portfolio=name,
+            parameters=SimpleNamespace(seconds=seconds, max_time=seconds),
+            start_date=None,
+            on_done=self._done,
+        )
+
+    def _done(self, job: OptimizationJob):
+        with self._condition:
+            self.finished.append(job)
+            self._condition.notify_all()
+
+    def wait(self, count: int, timeout: float = 20):
+        with self._condition:
+            assert self._condition.wait_for(
+                lambda: len(self.finished) >= count, timeout
+            )
+
+    @property
+    def names(self) -> list[str]:
+        return [job.portfolio for job in self.finished]
+
+
+def wait_until(condition, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_job_result_comes_from_the_process():
+    jobs = Jobs()
+    session = OptimizationWorker()
+
+    session.submit(jobs.make('a', 0))
+    session.submit(jobs.make('falha', 0))
+    jobs.wait(2)
+
+    done, failed = jobs.finished
+    assert (done.status, done.result) == (JobStatus.DONE, 'a')
+    assert failed.status is JobStatus.FAILED
+    assert str(failed.error) == 'sem solução'
+
+
+def test_cancelling_a_running_job_terminates_it():
+    jobs = Jobs()
+    session = OptimizationWorker()
+    job = session.submit(jobs.make('lento', 60))
+    wait_until(lambda: job.status is JobStatus.RUNNING)
+
+    session.cancel_current()
+    jobs.wait(1)
+
+    assert job.status is JobStatus.CANCELLED
+    assert job.result is None
+    assert job.elapsed() < 30
+
+
+def test_cancelling_a_job_waiting_for_the_pool():
+    jobs = Jobs()
+    pool = SolverPool(max_workers=1, max_waiting=4)
+    first, second = [OptimizationWorker(pool=pool) for _ in range(2)]
+    running = first.submit(jobs.make('lento', 60))
+    wait_until(lambda: running.status is JobStatus.RUNNING)
+    waiting = second.submit(jobs.make('na fila', 0))
+    wait_until(lambda: pool.waiting == 1)
+
+    second.cancel_current()
+    jobs.wait(1)
+
+    assert jobs.finished == [waiting]
+    assert waiting.status is JobStatus.CANCELLED
+    assert waiting.started_at is None
+    assert pool.waiting == 0
+
+    first.cancel_current()
+    jobs.wait(2)
+    # The slot is free again for the next job.
+    assert pool.acquire(cancelled=lambda: False)
+
+
+def test_sessions_take_turns_on_the_pool():
+    jobs = Jobs()
+    pool = SolverPool(max_workers=1, max_waiting=4)
+    first, second = [OptimizationWorker(pool=pool) for _ in range(2)]
+    a1 = first.submit(jobs.make('a1', 0.5))
+    first.submit(jobs.make('a2', 0))
+    first.submit(jobs.make('a3', 0))
+    wait_until(lambda: a1.status is JobStatus.RUNNING)
+
+    second.submit(jobs.make('b1', 0))
+    jobs.wait(4)
+
+    # b1 arrived after a1 started, so it goes before the rest of a's queue.
+    assert jobs.names == ['a1', 'b1', 'a2', 'a3']
+
+
+def test_max_pending_limits_a_session_queue():
+    jobs = Jobs()
+    session = OptimizationWorker(max_pending=1)
+    running = session.submit(jobs.make('lento', 60))
+    wait_until(lambda: running.status is JobStatus.RUNNING)
+    session.submit(jobs.make('na fila', 0))
+
+    with pytest.raises(PoolSaturatedError, match='sessão'):
+        session.submit(jobs.make('recusada', 0))
+
+    session.cancel_all()
+    jobs.wait(2)
+    assert [job.status for job in jobs.finished] == [JobStatus.CANCELLED] * 2
+
+
+def test_max_waiting_refuses_new_jobs_when_every_solver_is_busy():
+    jobs = Jobs()
+    pool = SolverPool(max_workers=1, max_waiting=1)
+    sessions = [OptimizationWorker(pool=pool) for _ in range(3)]
+    running = sessions[0].submit(jobs.make('lento', 60))
+    wait_until(lambda: running.status is JobStatus.RUNNING)
+    sessions[1].submit(jobs.make('esperando', 0))
+    wait_until(lambda: pool.waiting == 1)
+
+    assert pool.saturated
+    with pytest.raises(PoolSaturatedError, match='otimizadores'):
+        sessions[2].submit(jobs.make('recusada', 0))
+
+    sessions[0].cancel_current()
+    jobs.wait(2)
+    assert jobs.names == ['lento', 'esperando']
+    assert not pool.saturated